@@ -0,0 +1,56 @@
+# shared helpers for the benchmark scripts
+import inspect
+import os
+import tempfile
+import time
+
+import database
+
+
+def temp_db_path(name: str = "bench.db"):
+    """Point database.DB_PATH at a fresh file in a temp dir and return it."""
+    path = os.path.join(tempfile.mkdtemp(prefix="blushy-bench-"), name)
+    database.DB_PATH = path
+    return path
+
+
+async def ops_per_sec(fn, n: int):
+    """Await fn(i) n times and return ops/sec."""
+    start = time.perf_counter()
+    for i in range(n):
+        await fn(i)
+    elapsed = time.perf_counter() - start
+    return n / elapsed if elapsed else float("inf")
+
+
+def percentile(values, pct: float):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+async def measure(fn, n: int, warmup: int = 10):
+    """Time n calls of fn(i) (sync or async). Returns ops/sec and latency percentiles in µs."""
+    for i in range(min(warmup, n)):
+        result = fn(i)
+        if inspect.isawaitable(result):
+            await result
+
+    samples = []
+    clock = time.perf_counter_ns
+    start = clock()
+    for i in range(n):
+        t0 = clock()
+        result = fn(i)
+        if inspect.isawaitable(result):
+            await result
+        samples.append((clock() - t0) / 1000)
+    elapsed = (clock() - start) / 1e9
+    return {
+        "ops_per_sec": n / elapsed if elapsed else float("inf"),
+        "p50_us": percentile(samples, 50),
+        "p99_us": percentile(samples, 99),
+        "n": n,
+    }
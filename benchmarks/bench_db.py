@@ -0,0 +1,104 @@
+# Before/after ops/sec for the reminder and game-reset DB paths.
+# "before" reproduces the old helpers (one aiosqlite.connect + commit per call),
+# "after" runs the pooled helpers from database.py against the same schema.
+import argparse
+import asyncio
+import datetime
+import time
+
+import aiosqlite
+
+import database
+from benchmarks._util import temp_db_path, ops_per_sec
+
+GUILD_ID = 1
+
+
+# --- legacy helpers (connection per call) ---
+async def legacy_add_reminder(i):
+    remind_at = int(time.time())
+    async with aiosqlite.connect(database.DB_PATH) as db:
+        await db.execute(
+            "INSERT INTO reminders (user_id, reason, remind_at, channel_id, recurring_interval) VALUES (?, ?, ?, ?, ?)",
+            (str(i), "bench", remind_at, "1", None)
+        )
+        await db.commit()
+
+async def legacy_get_due(_):
+    async with aiosqlite.connect(database.DB_PATH) as db:
+        async with db.execute(
+            "SELECT id, user_id, reason, remind_at, channel_id, recurring_interval FROM reminders WHERE remind_at <= ?",
+            (int(time.time()),)
+        ) as cursor:
+            return await cursor.fetchall()
+
+async def legacy_delete_reminder(i):
+    async with aiosqlite.connect(database.DB_PATH) as db:
+        await db.execute("DELETE FROM reminders WHERE id = ?", (i + 1,))
+        await db.commit()
+
+async def legacy_game_reset_tick(_):
+    async with aiosqlite.connect(database.DB_PATH) as db:
+        async with db.execute("SELECT name, reset_hour, tz, icon FROM games WHERE guild_id = ?", (GUILD_ID,)) as cursor:
+            games = [row[0] for row in await cursor.fetchall()]
+    for game in games:
+        async with aiosqlite.connect(database.DB_PATH) as db:
+            async with db.execute(
+                "SELECT message_id FROM game_resets WHERE guild_id = ? AND game_name = ?", (GUILD_ID, game)
+            ) as cur:
+                await cur.fetchone()
+
+
+# --- pooled helpers ---
+async def pooled_add_reminder(i):
+    await database.add_reminder(str(i), "bench", datetime.datetime.now(datetime.timezone.utc), "1")
+
+async def pooled_get_due(_):
+    await database.get_due_reminders()
+
+async def pooled_delete_reminder(i):
+    await database.delete_reminder(i + 1)
+
+async def pooled_game_reset_tick(_):
+    games = await database.get_all_games(GUILD_ID)
+    for game in games:
+        await database.get_message_id(GUILD_ID, game)
+
+
+async def run(n: int, games: int):
+    results = {}
+    for label, funcs in (
+        ("before", (legacy_add_reminder, legacy_get_due, legacy_delete_reminder, legacy_game_reset_tick)),
+        ("after", (pooled_add_reminder, pooled_get_due, pooled_delete_reminder, pooled_game_reset_tick)),
+    ):
+        temp_db_path()
+        await database.init_db()
+        for g in range(games):
+            await database.add_game(GUILD_ID, f"Game {g}", g % 24, "Europe/Berlin")
+            await database.save_message_id(GUILD_ID, f"Game {g}", 1000 + g)
+        if label == "before":
+            # the legacy path never touched the pool; close it so it doesn't skew the numbers
+            await database.close_db()
+
+        add, due, delete, tick = funcs
+        results[label] = {
+            "add_reminder": await ops_per_sec(add, n),
+            "get_due_reminders": await ops_per_sec(due, max(1, n // 10)),
+            "delete_reminder": await ops_per_sec(delete, n),
+            "game_reset_tick": await ops_per_sec(tick, max(1, n // 50)),
+        }
+        await database.close_db()
+
+    print(f"{'path':<20}{'before ops/s':>15}{'after ops/s':>15}{'speedup':>10}")
+    for key in results["before"]:
+        before, after = results["before"][key], results["after"][key]
+        print(f"{key:<20}{before:>15.1f}{after:>15.1f}{after / before:>9.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=500, help="operations per path")
+    parser.add_argument("--games", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.n, args.games))
@@ -0,0 +1,106 @@
+# Outbound queue under a reset-embed refresh storm.
+# A stand-in for Discord's REST layer enforces a per-channel limit and answers
+# with 429s (plus rate-limit headers) when it is exceeded. 200 embed edits are
+# queued at once (each twice, to exercise coalescing) while reminders keep
+# arriving; we report throughput, 429s and reminder latency.
+import argparse
+import asyncio
+import random
+import time
+
+import discord
+
+from dispatch import OutboundQueue, PRIORITY_REMINDER, PRIORITY_REFRESH
+from benchmarks._util import percentile
+
+
+class FakeResponse:
+    def __init__(self, status, headers):
+        self.status = status
+        self.reason = "Too Many Requests" if status == 429 else "OK"
+        self.headers = headers
+
+
+class FakeREST:
+    """Per-channel fixed window limiter with configurable latency."""
+
+    def __init__(self, limit: int, window: float, latency: float):
+        self.limit = limit
+        self.window = window
+        self.latency = latency
+        self.windows = {}
+        self.calls = 0
+        self.rate_limited = 0
+
+    async def request(self, channel_id):
+        await asyncio.sleep(self.latency)
+        self.calls += 1
+        now = time.monotonic()
+        start, used = self.windows.get(channel_id, (now, 0))
+        if now - start >= self.window:
+            start, used = now, 0
+        if used >= self.limit:
+            self.rate_limited += 1
+            reset_after = self.window - (now - start)
+            raise discord.HTTPException(
+                FakeResponse(429, {
+                    "Retry-After": f"{reset_after:.3f}",
+                    "X-RateLimit-Limit": str(self.limit),
+                    "X-RateLimit-Remaining": "0",
+                    "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+                }),
+                "You are being rate limited."
+            )
+        self.windows[channel_id] = (start, used + 1)
+        return channel_id
+
+
+async def run(games: int, reminders: int, window: float, latency: float):
+    rest = FakeREST(limit=5, window=window, latency=latency)
+    queue = OutboundQueue(route_per=window, max_concurrency=8)
+    queue.start()
+    dashboard_channel = 1
+    reminder_latency = []
+
+    async def refresh():
+        jobs = []
+        for _ in range(2):  # duplicate refresh -> coalesced edits
+            for g in range(games):
+                jobs.append(queue.submit(
+                    dashboard_channel, lambda: rest.request(dashboard_channel),
+                    priority=PRIORITY_REFRESH, coalesce_key=("edit", g)
+                ))
+        await asyncio.gather(*jobs)
+
+    async def reminder(i):
+        await asyncio.sleep(random.uniform(0, window * 4))
+        channel = dashboard_channel if i % 2 else 100 + i % 5
+        start = time.monotonic()
+        await queue.submit(channel, lambda: rest.request(channel), priority=PRIORITY_REMINDER)
+        reminder_latency.append(time.monotonic() - start)
+
+    start = time.monotonic()
+    refresh_task = asyncio.create_task(refresh())
+    await asyncio.gather(*(reminder(i) for i in range(reminders)))
+    reminders_done = time.monotonic() - start
+    await refresh_task
+    elapsed = time.monotonic() - start
+    queue.stop()
+
+    ms = [x * 1000 for x in reminder_latency]
+    print(f"{games} game edits (x2 submitted) + {reminders} reminders in {elapsed:.2f}s")
+    print(f"  API calls: {rest.calls}  429s: {rest.rate_limited}  queue stats: {queue.stats}")
+    print(f"  throughput: {queue.stats['sent'] / elapsed:.1f} successful calls/s")
+    print(f"  reminders finished after {reminders_done:.2f}s")
+    for pct in (50, 95, 99):
+        print(f"  reminder p{pct} latency: {percentile(ms, pct):8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--reminders", type=int, default=50)
+    parser.add_argument("--window", type=float, default=0.25, help="rate-limit window in seconds (Discord: 5.0)")
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated API latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(run(args.games, args.reminders, args.window, args.latency))
@@ -0,0 +1,151 @@
+# Gateway cache memory: RSS growth of the "minimal" vs "full" cache profile
+# after a simulated large guild (no network, no token).
+#
+# A local gateway stand-in feeds discord.py's ConnectionState the same dispatch
+# payloads Discord would send (GUILD_CREATE with members/presences/voice states,
+# then MESSAGE_CREATE and PRESENCE_UPDATE traffic). Each profile runs in its own
+# subprocess so the RSS numbers don't leak into each other.
+#
+#   python -m benchmarks.bench_gateway_memory --members 50000 --messages 20000
+import argparse
+import asyncio
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+
+GUILD_ID = 1
+BOT_ID = 10
+
+
+def rss_kib():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # peak, but all we get off Linux
+
+
+def user_payload(user_id: int):
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0", "avatar": None, "global_name": None}
+
+
+def member_payload(user_id: int):
+    return {"user": user_payload(user_id), "roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0}
+
+
+def guild_create(members: int, voice: int, presences: int):
+    """GUILD_CREATE as a fully chunked guild looks to the cache."""
+    channels = [{"id": "100", "type": 0, "name": "general", "position": 0, "permission_overwrites": []}]
+    channels += [
+        {"id": str(200 + v), "type": 2, "name": f"voice {v}", "position": v, "permission_overwrites": [], "bitrate": 64000, "user_limit": 0}
+        for v in range(5)
+    ]
+    return {
+        "id": str(GUILD_ID), "name": "Big Guild", "owner_id": str(BOT_ID), "member_count": members + 1, "large": True,
+        "roles": [{"id": str(GUILD_ID), "name": "@everyone", "permissions": "0", "position": 0, "color": 0,
+                   "hoist": False, "managed": False, "mentionable": False}],
+        "emojis": [], "stickers": [], "features": [], "channels": channels, "threads": [],
+        "members": [member_payload(BOT_ID)] + [member_payload(1000 + m) for m in range(members)],
+        "presences": [
+            {"user": {"id": str(1000 + p)}, "status": "online", "activities": [{"name": "a game", "type": 0}], "client_status": {"desktop": "online"}}
+            for p in range(presences)
+        ],
+        "voice_states": [
+            {"user_id": str(1000 + v), "channel_id": str(200 + v % 5), "session_id": "x", "deaf": False, "mute": False,
+             "self_deaf": False, "self_mute": False, "suppress": False}
+            for v in range(voice)
+        ],
+    }
+
+
+def message_create(message_id: int, author_id: int):
+    return {
+        "id": str(message_id), "channel_id": "100", "guild_id": str(GUILD_ID), "author": user_payload(author_id),
+        "member": {"roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0},
+        "content": "x" * 120, "timestamp": "2024-01-01T00:00:00+00:00", "edited_timestamp": None, "tts": False,
+        "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [], "embeds": [],
+        "pinned": False, "type": 0,
+    }
+
+
+async def profile_run(profile: str, members: int, voice: int, presences: int, messages: int):
+    os.environ.setdefault("TOKEN", "bench")
+    os.environ["CACHE_PROFILE"] = profile
+    import discord
+    from config import cache_options
+
+    options = cache_options(profile)
+    client = discord.Client(**{**options, "chunk_guilds_at_startup": False})  # members already sit in the payload
+    state = client._connection
+    state.user = discord.ClientUser(state=state, data={**user_payload(BOT_ID), "bot": True})
+
+    # build the payload before the baseline and keep it alive, so only the cache itself is measured
+    payload = guild_create(members, voice, presences)
+    gc.collect()
+    before = rss_kib()
+
+    # dispatch through the same gate the websocket uses: events for disabled intents never arrive
+    intents = options["intents"]
+    state.parse_guild_create(payload)
+    if intents.guild_messages:
+        for m in range(messages):
+            state.parse_message_create(message_create(10**6 + m, 1000 + m % max(members, 1)))
+    if intents.presences:
+        for p in range(min(messages, members)):
+            state.parse_presence_update({"guild_id": str(GUILD_ID), "user": {"id": str(1000 + p)}, "status": "idle",
+                                         "activities": [], "client_status": {"mobile": "idle"}})
+    gc.collect()
+    after = rss_kib()
+
+    guild = client.get_guild(GUILD_ID)
+    in_voice = sum(len(channel.members) for channel in guild.voice_channels)
+    return {
+        "profile": profile,
+        "rss_delta_kib": after - before,
+        "cached_members": len(guild._members),
+        "cached_messages": len(state._messages or ()),
+        "members_in_voice": in_voice,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--members", type=int, default=50000)
+    parser.add_argument("--voice", type=int, default=50)
+    parser.add_argument("--presences", type=int, default=10000)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--profile", choices=("minimal", "full"), help=argparse.SUPPRESS)  # child process
+    args = parser.parse_args()
+
+    sizes = (args.members, args.voice, args.presences, args.messages)
+    if args.profile:
+        print(json.dumps(asyncio.run(profile_run(args.profile, *sizes))))
+        return
+
+    results = {}
+    for profile in ("full", "minimal"):
+        out = subprocess.check_output(
+            [sys.executable, "-m", "benchmarks.bench_gateway_memory", "--profile", profile,
+             "--members", str(args.members), "--voice", str(args.voice),
+             "--presences", str(args.presences), "--messages", str(args.messages)],
+            text=True
+        )
+        results[profile] = json.loads(out.strip().splitlines()[-1])
+
+    print(f"Simulated guild: {args.members} members, {args.voice} in voice, {args.presences} presences, {args.messages} messages")
+    for result in results.values():
+        print(f"  {result['profile']:>7}: +{result['rss_delta_kib'] / 1024:7.1f} MiB RSS, "
+              f"{result['cached_members']} members, {result['cached_messages']} messages cached, "
+              f"{result['members_in_voice']} members visible in voice")
+    saved = results["full"]["rss_delta_kib"] - results["minimal"]["rss_delta_kib"]
+    print(f"  minimal profile saves {saved / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# Offline micro-benchmarks for the bot's hot paths (no network, no token).
+# Seeds a temp data.db (default 1k games, 100k reminders), times each path and
+# writes ops/sec + p50/p99 latency to JSON. Pass --baseline with an older
+# result file to flag regressions.
+#
+#   python -m benchmarks.bench_hot_paths --baseline benchmarks/results/<old>.json
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import subprocess
+import time
+
+import database
+from benchmarks._util import temp_db_path, measure
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+REGRESSION_THRESHOLD = 0.10  # flag paths that got >10% slower
+GUILD_ID = 1
+
+
+async def seed(games: int, reminders: int):
+    pool = await database.get_pool()
+    now = int(time.time())
+    async with pool.write() as db:
+        await db.executemany(
+            "INSERT INTO games (guild_id, name, reset_hour, tz, icon) VALUES (?, ?, ?, ?, ?)",
+            [(GUILD_ID, f"Game {g}", g % 24, random.choice(("Europe/Berlin", "America/New_York", "Asia/Tokyo", "Etc/GMT")),
+              "https://example.com/icon.png" if g % 2 else "") for g in range(games)]
+        )
+        await db.executemany(
+            "INSERT INTO game_resets (guild_id, game_name, message_id) VALUES (?, ?, ?)",
+            [(GUILD_ID, f"Game {g}", 10**17 + g) for g in range(games)]
+        )
+        await db.executemany(
+            "INSERT INTO reminders (user_id, reason, remind_at, channel_id, recurring_interval) VALUES (?, ?, ?, ?, ?)",
+            [(str(random.randrange(1000)), f"reminder {r}", now + random.randrange(-60, 30 * 86400),
+              str(random.randrange(50)), 3600 if r % 10 == 0 else None) for r in range(reminders)]
+        )
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(games: int, reminders: int, n: int):
+    from cogs import resets, reminders as reminder_cog  # imported late so DB_PATH already points at the temp file
+
+    temp_db_path()
+    await database.init_db()
+    await seed(games, reminders)
+
+    game_infos = list((await database.get_all_games(GUILD_ID)).items())
+    reminder_rows = (await database.get_all_reminders())[:25]
+    now_utc = datetime.datetime.now(datetime.timezone.utc)
+    inputs = ["45m", "2h30m", "1d2h15m", "24/12/2030 18:00"]
+
+    def reset_embed(i):
+        game, info = game_infos[i % len(game_infos)]
+        return resets.embed_fingerprint(resets.build_reset_embed(game, info))
+
+    paths = {
+        "get_next_reset": lambda i: resets.get_next_reset(i % 24, "Europe/Berlin"),
+        "parse_reminder_time": lambda i: reminder_cog.parse_reminder_time(inputs[i % len(inputs)]),
+        "format_german_time": lambda i: reminder_cog.format_german_time(now_utc + datetime.timedelta(hours=i % 72)),
+        "build_reset_embed+fingerprint": reset_embed,
+        "build_reminder_embed": lambda i: reminder_cog.build_reminder_embed("bench", now_utc),
+        "build_reminders_embed(25)": lambda i: reminder_cog.build_reminders_embed(reminder_rows),
+        "db.get_all_games": lambda i: database.get_all_games(GUILD_ID),
+        "db.get_message_state": lambda i: database.get_message_state(GUILD_ID, f"Game {i % games}"),
+        "db.get_due_reminders": lambda i: database.get_due_reminders(),
+        "db.add_reminder": lambda i: database.add_reminder("1", "bench", now_utc, "1"),
+        "db.update_reminder_time": lambda i: database.update_reminder_time(i + 1, now_utc),
+        "db.delete_reminder": lambda i: database.delete_reminder(reminders + i + 1),
+    }
+    slow = {"db.get_all_games", "db.get_due_reminders"}
+
+    results = {}
+    print(f"{'path':<32}{'ops/s':>12}{'p50 µs':>10}{'p99 µs':>10}")
+    for name, fn in paths.items():
+        stats = await measure(fn, max(10, n // 20) if name in slow else n)
+        results[name] = stats
+        print(f"{name:<32}{stats['ops_per_sec']:>12.1f}{stats['p50_us']:>10.1f}{stats['p99_us']:>10.1f}")
+    await database.close_db()
+
+    return {
+        "revision": git_revision(),
+        "timestamp": int(time.time()),
+        "scale": {"games": games, "reminders": reminders},
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline_path: str):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline.get('revision')} ({baseline_path}):")
+    regressions = 0
+    for name, stats in report["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            continue
+        change = stats["ops_per_sec"] / old["ops_per_sec"] - 1
+        flag = "  ⚠️ regression" if change < -REGRESSION_THRESHOLD else ""
+        regressions += bool(flag)
+        print(f"  {name:<32}{change:>+8.1%}{flag}")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--reminders", type=int, default=100_000)
+    parser.add_argument("-n", type=int, default=2000, help="iterations per path")
+    parser.add_argument("--out", help="result JSON path (default: benchmarks/results/<git rev>.json)")
+    parser.add_argument("--baseline", help="earlier result JSON to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.games, args.reminders, args.n))
+    out = args.out or os.path.join(RESULTS_DIR, f"{report['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Saved results to {out}")
+
+    if args.baseline and compare(report, args.baseline):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
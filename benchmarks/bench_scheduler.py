@@ -0,0 +1,49 @@
+# Delivery lateness of the in-process reminder scheduler.
+# Schedules thousands of reminders spread over a few seconds and records
+# (delivery time - due time) for each one, then prints the percentiles.
+import argparse
+import asyncio
+import random
+import time
+
+from scheduler import DueScheduler
+from benchmarks._util import percentile
+
+
+async def run(count: int, spread: float):
+    lateness = []
+    done = asyncio.Event()
+
+    async def on_due(items):
+        now = time.time()
+        for due, _ in items:
+            lateness.append(now - due)
+        if len(lateness) >= count:
+            done.set()
+
+    scheduler = DueScheduler(on_due)
+    start = time.time() + 0.2
+    for i in range(count):
+        scheduler.schedule(i, start + random.uniform(0, spread), None)
+    # cancel + re-add a slice to exercise in-place updates
+    for i in range(0, count, 10):
+        scheduler.cancel(i)
+        scheduler.schedule(i, start + random.uniform(0, spread), None)
+
+    scheduler.start()
+    await asyncio.wait_for(done.wait(), timeout=spread + 10)
+    scheduler.stop()
+
+    ms = [x * 1000 for x in lateness]
+    print(f"delivered {len(ms)} reminders over {spread:.1f}s")
+    for pct in (50, 95, 99, 100):
+        print(f"  p{pct:<3} lateness: {percentile(ms, pct):7.2f} ms")
+    return ms
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--spread", type=float, default=5.0, help="seconds the due times are spread over")
+    args = parser.parse_args()
+    asyncio.run(run(args.count, args.spread))
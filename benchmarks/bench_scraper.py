@@ -0,0 +1,89 @@
+# Parse time and peak memory of the prime schedule parser on a saved page.
+# "legacy" is the original full-document html.parser implementation,
+# "targeted" is prime_scraper.parse_prime_page (SoupStrainer on #post-2010).
+import argparse
+import os
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from prime_scraper import parse_prime_page
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "jwflab_prime_order.html")
+
+
+def legacy_parse(html: str):
+    soup = BeautifulSoup(html, "html.parser")
+    content = soup.select_one("#post-2010 .cm-entry-summary")
+    if not content:
+        raise Exception("Content container not found")
+
+    target_table = None
+    for table in content.find_all("table"):
+        headers = [th.get_text(strip=True) for th in table.find_all("th")]
+        if "Prime" in headers and "Scheduled Prime release" in headers:
+            target_table = table
+            break
+    if not target_table:
+        raise Exception("Prime schedule table not found")
+
+    confirmed = None
+    paragraphs = []
+    for element in content.children:
+        if element == target_table:
+            break
+        if getattr(element, "name", None) == "p":
+            paragraphs.append(element)
+    for p in reversed(paragraphs):
+        text = p.get_text(strip=True)
+        if "(" in text and ")" in text and "," in text:
+            confirmed = text
+            break
+
+    results = []
+    for row in target_table.find("tbody").find_all("tr"):
+        cols = row.find_all("td")
+        if len(cols) < 3:
+            continue
+        prime_name = cols[1].get_text(strip=True)
+        release_date = cols[2].get_text(strip=True)
+        if prime_name and release_date:
+            results.append((prime_name, release_date))
+    return confirmed, results
+
+
+def measure(fn, html: str, rounds: int):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(html)
+    per_call = (time.perf_counter() - start) / rounds
+
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_call, peak
+
+
+def run(path: str, rounds: int):
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read()
+    assert legacy_parse(html) == parse_prime_page(html), "parsers disagree on the fixture"
+
+    results = {}
+    print(f"fixture: {os.path.basename(path)} ({len(html) / 1024:.0f} KiB), {rounds} rounds")
+    print(f"{'parser':<10}{'ms/parse':>12}{'peak KiB':>12}")
+    for label, fn in (("legacy", legacy_parse), ("targeted", parse_prime_page)):
+        per_call, peak = measure(fn, html, rounds)
+        results[label] = {"ms_per_parse": per_call * 1000, "peak_kib": peak / 1024}
+        print(f"{label:<10}{per_call * 1000:>12.2f}{peak / 1024:>12.0f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixture", default=FIXTURE)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    run(args.fixture, args.rounds)
@@ -0,0 +1,93 @@
+# Consistency check for the games/game_resets read-through cache (no network, no token).
+#
+# Runs rounds of random concurrent writes (add_game, remove_game, save_message_id,
+# take_game_messages) mixed with cached reads against a temp data.db. After every
+# round the cached view of each guild is compared with a direct SQL read, then
+# the hit/miss counters are printed.
+#
+#   python -m benchmarks.check_db_cache --rounds 500
+import argparse
+import asyncio
+import random
+import sys
+
+import database
+from benchmarks._util import temp_db_path
+from metrics import DB_CACHE
+
+GUILDS = (1, 2, 3)
+NAMES = [f"Game {n}" for n in range(20)]
+
+
+async def db_state(guild_id: int):
+    """What the tables really contain, bypassing the cache."""
+    pool = await database.get_pool()
+    async with pool.read() as db:
+        async with db.execute("SELECT name, reset_hour, tz, icon FROM games WHERE guild_id = ?", (guild_id,)) as cur:
+            games = {row[0]: {"reset_hour": row[1], "tz": row[2], "icon": row[3]} for row in await cur.fetchall()}
+        async with db.execute(
+            "SELECT game_name, message_id, embed_hash FROM game_resets WHERE guild_id = ?", (guild_id,)
+        ) as cur:
+            messages = {row[0]: (row[1], row[2]) for row in await cur.fetchall()}
+    return games, messages
+
+
+async def cached_state(guild_id: int):
+    games = await database.get_all_games(guild_id)
+    messages = {name: await database.get_message_state(guild_id, name) for name in NAMES}
+    return games, {name: state for name, state in messages.items() if state != (None, None)}
+
+
+def random_op(rng: random.Random):
+    guild_id = rng.choice(GUILDS)
+    name = rng.choice(NAMES)
+    roll = rng.random()
+    if roll < 0.25:
+        return database.add_game(guild_id, name, rng.randrange(24), rng.choice(("Etc/GMT", "Asia/Tokyo")))
+    if roll < 0.40:
+        return database.remove_game(guild_id, name)
+    if roll < 0.65:
+        return database.save_message_id(guild_id, name, rng.randrange(10**6), f"{rng.getrandbits(32):08x}")
+    if roll < 0.70:
+        return database.take_game_messages(guild_id)
+    if roll < 0.85:
+        return database.get_all_games(guild_id)
+    return database.get_message_state(guild_id, name)
+
+
+async def run(rounds: int, ops: int, seed: int):
+    rng = random.Random(seed)
+    temp_db_path()
+    await database.init_db()
+
+    mismatches = 0
+    for r in range(rounds):
+        # writes and reads interleave on the event loop like concurrent command handlers
+        await asyncio.gather(*(random_op(rng) for _ in range(ops)))
+        if rng.random() < 0.05:
+            database.games_cache.invalidate()  # cold start in the middle of the run
+        for guild_id in GUILDS:
+            expected = await db_state(guild_id)
+            actual = await cached_state(guild_id)
+            if actual != expected:
+                mismatches += 1
+                print(f"❌ round {r}, guild {guild_id}: cache {actual} != db {expected}")
+
+    await database.close_db()
+    print(f"{rounds} rounds x {ops} ops, {mismatches} mismatches")
+    for (table, result), count in sorted(DB_CACHE.values.items()):
+        print(f"  {table} {result}: {int(count)}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--ops", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    sys.exit(1 if asyncio.run(run(args.rounds, args.ops, args.seed)) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Correctness check for recurrence.CalendarRule.advance (no network, no token).
+#
+# advance() skips whole weeks arithmetically; this compares it with plain
+# occurrence-by-occurrence stepping (next_after until past now) for random
+# due/now pairs, plus fixed cases around the Europe/Berlin DST changes where a
+# week is 167 or 169 hours long. Any mismatch is printed and the exit code is 1.
+#
+#   python -m benchmarks.check_recurrence --cases 2000
+import argparse
+import datetime
+import random
+import sys
+
+import pytz
+
+from recurrence import parse_rule
+
+RULES = ("every day 20:00", "every mon 20:00", "every mon,fri 08:30", "every weekend 02:30",
+         "every day 00:15 America/New_York", "every weekday 09:00 Etc/GMT")
+
+
+def stepped(rule, due: int, now: int):
+    """Reference answer: walk every occurrence."""
+    missed, cursor = 0, rule.next_after(due)
+    while cursor <= now:
+        missed += 1
+        cursor = rule.next_after(cursor)
+    return missed, cursor
+
+
+def berlin(*args):
+    return int(pytz.timezone("Europe/Berlin").localize(datetime.datetime(*args)).timestamp())
+
+
+# (rule, due, now, expected missed) across the autumn (2026-10-25) and spring (2027-03-28) changes
+DST_CASES = (
+    ("every day 20:00", berlin(2026, 10, 20, 20), berlin(2026, 10, 27, 21), 7),
+    ("every mon 20:00", berlin(2026, 10, 19, 20), berlin(2026, 10, 26, 21), 1),
+    ("every day 20:00", berlin(2027, 3, 23, 20), berlin(2027, 3, 30, 21), 7),
+    ("every mon 20:00", berlin(2027, 3, 22, 20), berlin(2027, 4, 5, 19, 30), 1),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    cases = [(parse_rule(text), due, now, expected) for text, due, now, expected in DST_CASES]
+    start = berlin(2026, 1, 1)
+    for _ in range(args.cases):
+        rule = parse_rule(rng.choice(RULES))
+        due = rule.next_after(start + rng.randrange(2 * 365 * 86400))
+        cases.append((rule, due, due + rng.randrange(1, 60 * 86400), None))
+
+    mismatches = 0
+    for rule, due, now, expected in cases:
+        actual = rule.advance(due, now)
+        reference = stepped(rule, due, now)
+        if actual != reference or (expected is not None and actual[0] != expected):
+            mismatches += 1
+            print(f"❌ {rule}: due {due} now {now}: advance {actual}, stepping {reference}, expected missed {expected}")
+    print(f"{len(cases)} cases ({len(DST_CASES)} fixed DST cases), {mismatches} mismatches")
+    return mismatches
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
@@ -0,0 +1,172 @@
+# Multi-process check for reminder leasing (no network, no token).
+#
+# Seeds a temp data.db with due reminders, then starts several worker processes
+# that run the reminders cog's real claim/deliver/apply path against it with a fake REST
+# channel. One worker "crashes" right after its first claim, so its leased rows
+# must be picked up by the others once the lease expires. At the end every
+# reminder has to have been sent exactly once and logged in reminder_deliveries.
+#
+#   python -m benchmarks.check_reminder_leases --workers 4 --reminders 2000
+import argparse
+import asyncio
+import collections
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import database
+
+LEASE = 3  # short, so the crashed worker's batch comes back quickly
+
+
+async def seed(reminders: int, channels: int):
+    await database.init_db()
+    pool = await database.get_pool()
+    now = int(time.time())
+    async with pool.write() as db:
+        await db.executemany(
+            "INSERT INTO reminders (user_id, reason, remind_at, channel_id, recurring_interval) VALUES (?, ?, ?, ?, ?)",
+            [(str(r % 100), f"reminder {r}", now - r % 30, str(1000 + r % channels), 3600 if r % 10 == 0 else None)
+             for r in range(reminders)]
+        )
+    await database.close_db()
+
+
+async def delivery_log():
+    await database.init_db()
+    pool = await database.get_pool()
+    async with pool.read() as db:
+        async with db.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT reminder_id) FROM reminder_deliveries WHERE status = 'sent'"
+        ) as cur:
+            row = await cur.fetchone()
+    await database.close_db()
+    return row
+
+
+class FakeChannel:
+    """Stands in for get_partial_messageable(): records which reminder ids were sent by whom."""
+
+    def __init__(self, channel_id: int, log_path: str, worker: str):
+        self.id = channel_id
+        self._log_path = log_path
+        self._worker = worker
+
+    async def send(self, content=None, embeds=()):
+        await asyncio.sleep(0.005)  # a REST round trip
+        ids = [int(embed.description.split()[-1]) for embed in embeds]
+        line = json.dumps({"worker": self._worker, "ids": ids}) + "\n"
+        # O_APPEND keeps lines from different processes intact
+        fd = os.open(self._log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(fd, line.encode())
+        finally:
+            os.close(fd)
+
+
+async def child(db_path: str, log_path: str, worker: str, batch: int, crash: bool, deadline: float):
+    database.DB_PATH = db_path
+    import main
+    from cogs import reminders
+    from dispatch import OutboundQueue
+
+    await database.init_db()  # normally setup_hook's job
+    bot = main.bot
+    bot.rest_only = True
+    bot.worker_id = worker
+    reminders.REMINDER_LEASE = LEASE
+    reminders.REMINDER_CLAIM_BATCH = batch
+    bot.get_partial_messageable = lambda channel_id: FakeChannel(channel_id, log_path, worker)
+    # the fake sends are instant, only the global 50/s bucket would slow the run down
+    bot.outbound = OutboundQueue(route_capacity=10_000, global_capacity=10_000)
+    bot.outbound.start()
+    cog = reminders.Reminders(bot)  # driven directly, there is no gateway to load it into
+
+    if crash:
+        async def crash_after_claim(reminders):
+            os._exit(1)  # dies holding the leases of its first batch
+        cog._deliver_reminders = crash_after_claim
+
+    pool = await database.get_pool()
+    while time.time() < deadline:
+        await cog.deliver_reminders()
+        async with pool.read() as db:
+            async with db.execute("SELECT COUNT(*) FROM reminders WHERE remind_at <= ?", (int(time.time()),)) as cur:
+                (left,) = await cur.fetchone()
+        if not left:
+            break
+        await asyncio.sleep(0.2)
+    bot.outbound.stop()
+    await database.close_db()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--reminders", type=int, default=2000)
+    parser.add_argument("--channels", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=60)
+    # child process
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--log", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--crash", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--deadline", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(child(args.db, args.log, args.worker, args.batch, args.crash, args.deadline))
+        return
+
+    tmp = tempfile.mkdtemp(prefix="blushy-leases-")
+    db_path = os.path.join(tmp, "data.db")
+    log_path = os.path.join(tmp, "sent.jsonl")
+    database.DB_PATH = db_path
+    asyncio.run(seed(args.reminders, args.channels))
+
+    started = time.perf_counter()
+    deadline = time.time() + args.timeout
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.check_reminder_leases", "--child", "--db", db_path, "--log", log_path,
+             "--worker", f"worker-{w}", "--batch", str(args.batch), "--deadline", str(deadline)]
+            + (["--crash"] if w == 0 else []),
+            stdout=subprocess.DEVNULL
+        )
+        for w in range(args.workers)
+    ]
+    codes = [proc.wait() for proc in procs]
+    elapsed = time.perf_counter() - started
+
+    sent = collections.Counter()
+    per_worker = collections.Counter()
+    if os.path.exists(log_path):
+        with open(log_path) as f:
+            for line in f:
+                entry = json.loads(line)
+                sent.update(entry["ids"])
+                per_worker[entry["worker"]] += len(entry["ids"])
+
+    expected = set(range(args.reminders))
+    duplicates = {rid: n for rid, n in sent.items() if n > 1}
+    missing = expected - set(sent)
+    print(f"{args.workers} workers (worker-0 crashes after its first claim), {args.reminders} reminders, "
+          f"{elapsed:.1f}s, exit codes {codes}")
+    for worker, count in sorted(per_worker.items()):
+        print(f"  {worker}: {count} sent")
+    print(f"  duplicates: {len(duplicates)}, missing: {len(missing)}")
+
+    # every send must also have left exactly one row in the delivery log
+    logged, distinct = asyncio.run(delivery_log())
+    unlogged = sum(sent.values()) != logged or logged != distinct
+    print(f"  delivery log: {logged} sent rows for {distinct} reminders")
+    sys.exit(1 if duplicates or missing or unlogged else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+# In-process stand-in for Discord's REST API and interaction webhooks (no network, no token).
+#
+# install() swaps bot.http.request and the interaction webhook adapter for a router
+# that keeps channels/messages in memory, answers with the payload shapes discord.py
+# expects and adds some latency. Channel message routes get a per-channel fixed
+# window limit with Discord's rate-limit headers that answers 429s like the real API,
+# and 429s can also be injected there at random. Like HTTPClient.request, 429s are
+# slept through and retried (up to 5 tries), and every response is reported to the
+# bot's http_trace, so the outbound queue learns about them the way it does in
+# production. Every call is counted per route template.
+#
+# Gateway side: add_guild() feeds GUILD_CREATE through ConnectionState and ready()
+# fires on_ready, command() builds INTERACTION_CREATE payloads for
+# ConnectionState.parse_interaction_create and a future that resolves when the
+# bot answers it.
+import asyncio
+import collections
+import datetime
+import itertools
+import json
+import random
+import re
+import time
+
+import aiohttp
+import discord
+import multidict
+import yarl
+from discord.webhook.async_ import AsyncWebhookAdapter, async_context
+
+from benchmarks.bench_gateway_memory import user_payload, member_payload
+
+BOT_ID = 10
+APP_ID = 11
+EPHEMERAL = 1 << 6
+OPTION_TYPES = {str: 3, int: 4, bool: 5}  # python value -> application command option type
+
+
+class FakeResponse:
+    def __init__(self, status, headers=None):
+        self.status = status
+        self.reason = {404: "Not Found", 429: "Too Many Requests"}.get(status, "OK")
+        self.headers = multidict.CIMultiDict(headers or {})
+
+
+def _iso(ts: float):
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).isoformat()
+
+
+class _WebhookAdapter(AsyncWebhookAdapter):
+    """Interaction callbacks and followups go through webhook routes, not bot.http."""
+
+    def __init__(self, fake):
+        super().__init__()
+        self.fake = fake
+
+    async def request(self, route, session=None, *, payload=None, multipart=None, params=None, **kwargs):
+        if payload is None and multipart:
+            payload = json.loads(multipart[0]["value"]) # payload_json, files are ignored
+        return await self.fake.request(route, json=payload, params=params)
+
+
+class FakeDiscord:
+    def __init__(self, latency: float = 0.02, route_limit: int = 5, route_window: float = 5.0, inject_429: float = 0.0):
+        self.latency = latency
+        self.route_limit = route_limit
+        self.route_window = route_window
+        self.inject_429 = inject_429
+        self.state = None
+        self.http_trace = None
+
+        self.channels = {}  # channel id -> {message id: payload}
+        self.guild_channels = {}  # channel id -> guild id
+        self.command_ids = {}  # synced slash command name -> id
+        self.calls = collections.Counter()  # "METHOD /route/{template}" -> calls
+        self.rate_limited = 0  # 429s from the per-channel window
+        self.injected = 0  # random 429s
+        self.sent = []  # (received at, channel id, payload) of every message the bot posted
+        self.moves = []  # (guild id, user id, channel id) of member moves / voice kicks
+        self.answers = {}  # interaction id -> future resolved with the time of the first callback
+        self.interaction_channels = {}  # interaction id -> channel id it was invoked in
+        self._windows = {}
+        self._ids = itertools.count(discord.utils.time_snowflake(datetime.datetime.now(datetime.timezone.utc)))
+        self._patterns = {}
+        self._routes = {
+            "GET /users/@me": self.get_me,
+            "GET /oauth2/applications/@me": self.get_application,
+            "PUT /applications/{application_id}/commands": self.put_commands,
+            "POST /channels/{channel_id}/messages": self.create_message,
+            "GET /channels/{channel_id}/messages/{message_id}": self.get_message,
+            "PATCH /channels/{channel_id}/messages/{message_id}": self.edit_message,
+            "DELETE /channels/{channel_id}/messages/{message_id}": self.delete_message,
+            "PATCH /guilds/{guild_id}/members/{user_id}": self.edit_member,
+            "POST /interactions/{webhook_id}/{webhook_token}/callback": self.interaction_callback,
+            "POST /webhooks/{webhook_id}/{webhook_token}": self.followup,
+            "PATCH /webhooks/{webhook_id}/{webhook_token}/messages/{message_id}": self.edit_original,
+        }
+
+    # -----------------------------
+    # Wiring
+    # -----------------------------
+    def install(self, bot):
+        """Route the bot's REST and webhook traffic here.
+
+        The webhook adapter lives in a context variable, so call this from the task
+        that later dispatches the interactions (tasks copy the context they start in).
+        """
+        self.state = bot._connection
+        self.http_trace = bot.http.http_trace
+        bot.http.request = self.request
+        async_context.set(_WebhookAdapter(self))
+
+    def add_guild(self, guild_id: int, text_channels, voice_channels=(), voice_members=()):
+        """GUILD_CREATE with the given channel ids; voice_members are (user id, voice channel id)."""
+        channels = [
+            {"id": str(c), "type": 0, "name": f"text-{c}", "position": i, "permission_overwrites": []}
+            for i, c in enumerate(text_channels)
+        ]
+        channels += [
+            {"id": str(c), "type": 2, "name": f"voice-{c}", "position": i, "permission_overwrites": [],
+             "bitrate": 64000, "user_limit": 0}
+            for i, c in enumerate(voice_channels)
+        ]
+        for channel in channels:
+            self.channels.setdefault(int(channel["id"]), {})
+            self.guild_channels[int(channel["id"])] = guild_id
+        self.state.parse_guild_create({
+            "id": str(guild_id), "name": f"Guild {guild_id}", "owner_id": str(BOT_ID), "member_count": len(voice_members) + 1,
+            "large": False, "features": [], "emojis": [], "stickers": [], "threads": [], "presences": [],
+            "roles": [{"id": str(guild_id), "name": "@everyone", "permissions": "0", "position": 0, "color": 0,
+                       "hoist": False, "managed": False, "mentionable": False}],
+            "channels": channels,
+            "members": [member_payload(BOT_ID)] + [member_payload(user_id) for user_id, _ in voice_members],
+            "voice_states": [
+                {"user_id": str(user_id), "channel_id": str(channel_id), "session_id": "x", "deaf": False, "mute": False,
+                 "self_deaf": False, "self_mute": False, "suppress": False}
+                for user_id, channel_id in voice_members
+            ],
+        })
+
+    def ready(self, bot):
+        """What READY does for us: is_ready() turns true and the on_ready listeners run."""
+        bot._ready.set()
+        bot.dispatch("ready")
+
+    def command(self, name: str, user_id: int, channel_id: int, **options):
+        """INTERACTION_CREATE payload for a slash command plus a future for its first response."""
+        interaction_id = next(self._ids)
+        guild_id = self.guild_channels[channel_id]
+        self.answers[interaction_id] = asyncio.get_running_loop().create_future()
+        self.interaction_channels[interaction_id] = channel_id
+        payload = {
+            "id": str(interaction_id), "application_id": str(APP_ID), "type": 2, "version": 1,
+            "token": f"token-{interaction_id}", "attachment_size_limit": 8 * 1024 * 1024,
+            "guild_id": str(guild_id), "locale": "en-US", "guild_locale": "en-US", "app_permissions": "0",
+            "channel": {"id": str(channel_id), "type": 0, "guild_id": str(guild_id), "name": f"text-{channel_id}",
+                        "position": 0, "permission_overwrites": []},
+            "member": {**member_payload(user_id), "permissions": "0"},
+            "data": {
+                "id": str(self.command_ids.get(name, 0)), "name": name, "type": 1,
+                "options": [
+                    {"name": key, "type": OPTION_TYPES[type(value)], "value": value}
+                    for key, value in options.items() if value is not None
+                ],
+            },
+        }
+        return payload, self.answers[interaction_id]
+
+    # -----------------------------
+    # Router
+    # -----------------------------
+    def _match(self, template: str, url: str):
+        pattern = self._patterns.get(template)
+        if pattern is None:
+            pattern = self._patterns[template] = re.compile(re.sub(r"\{(\w+)\}", r"(?P<\1>[^/?]+)", template) + "$")
+        match = pattern.search(url)
+        return {k: int(v) if v.isdigit() else v for k, v in match.groupdict().items()} if match else {}
+
+    def _limit(self, key):
+        """Per-route fixed window like Discord's channel buckets, plus random 429 injection."""
+        now = time.monotonic()
+        start, used = self._windows.get(key, (now, 0))
+        if now - start >= self.route_window:
+            start, used = now, 0
+        reset_after = self.route_window - (now - start)
+        if used >= self.route_limit:
+            self.rate_limited += 1
+        elif self.inject_429 and random.random() < self.inject_429:
+            self.injected += 1
+            reset_after = random.uniform(0.05, 0.5)
+        else:
+            self._windows[key] = (start, used + 1)
+            return FakeResponse(200, {
+                "X-RateLimit-Limit": str(self.route_limit),
+                "X-RateLimit-Remaining": str(self.route_limit - used - 1),
+                "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+            })
+        return FakeResponse(429, {
+            "Retry-After": f"{reset_after:.3f}",
+            "X-RateLimit-Limit": str(self.route_limit),
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+        })
+
+    async def _report(self, route, response):
+        """Hand a response to the bot's http_trace, as aiohttp does for discord.py's session."""
+        if self.http_trace is None:
+            return
+        params = aiohttp.TraceRequestEndParams(route.method, yarl.URL(route.url), multidict.CIMultiDict(), response)
+        for callback in self.http_trace.on_request_end:
+            await callback(None, None, params)
+
+    async def request(self, route, *, json=None, **kwargs):
+        key = f"{route.method} {route.path}"
+        handler = self._routes.get(key)
+        if handler is None:
+            self.calls[key] += 1
+            raise discord.HTTPException(FakeResponse(404), {"code": 0, "message": f"fake_discord has no route for {key}"})
+        params = self._match(route.path, route.url)
+        limited = route.path.startswith("/channels/{channel_id}/messages")  # the buckets the outbound queue paces
+        for _ in range(5):
+            self.calls[key] += 1
+            if self.latency:
+                await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+            response = self._limit((key, params["channel_id"])) if limited else FakeResponse(200)
+            if response.status == 429:
+                await self._report(route, response)
+                await asyncio.sleep(float(response.headers["Retry-After"])) # what HTTPClient.request does
+                continue
+            try:
+                result = handler(json or {}, **params)
+            except discord.HTTPException as e:
+                await self._report(route, e.response)
+                raise
+            await self._report(route, response)
+            return result
+        raise discord.HTTPException(response, {"code": 0, "message": "You are being rate limited.", "global": False})
+
+    def _not_found(self, message: str):
+        return discord.NotFound(FakeResponse(404), {"code": 10008, "message": message})
+
+    def _message(self, channel_id: int, data: dict, message_id: int = None):
+        return {
+            "id": str(message_id or next(self._ids)), "channel_id": str(channel_id),
+            "author": {**user_payload(BOT_ID), "bot": True}, "content": data.get("content") or "",
+            "timestamp": _iso(time.time()), "edited_timestamp": None, "tts": False, "mention_everyone": False,
+            "mentions": [], "mention_roles": [], "attachments": [], "embeds": data.get("embeds") or [],
+            "components": data.get("components") or [], "pinned": False, "type": 0, "flags": data.get("flags") or 0,
+        }
+
+    # -----------------------------
+    # Routes
+    # -----------------------------
+    def get_me(self, data):
+        return {**user_payload(BOT_ID), "bot": True}
+
+    def get_application(self, data):
+        return {
+            "id": str(APP_ID), "name": "BlushyBot", "description": "", "icon": None, "bot_public": False,
+            "bot_require_code_grant": False, "owner": user_payload(1), "verify_key": "0", "flags": 0,
+        }
+
+    def put_commands(self, commands, application_id):
+        synced = []
+        for command in commands:
+            self.command_ids[command["name"]] = command_id = next(self._ids)
+            synced.append({**command, "id": str(command_id), "application_id": str(application_id), "version": "1"})
+        return synced
+
+    def create_message(self, data, channel_id):
+        if channel_id not in self.channels:
+            raise discord.NotFound(FakeResponse(404), {"code": 10003, "message": "Unknown Channel"})
+        message = self._message(channel_id, data)
+        self.channels[channel_id][int(message["id"])] = message
+        self.sent.append((time.time(), channel_id, message))
+        return message
+
+    def get_message(self, data, channel_id, message_id):
+        try:
+            return self.channels[channel_id][message_id]
+        except KeyError:
+            raise self._not_found("Unknown Message") from None
+
+    def edit_message(self, data, channel_id, message_id):
+        message = self.get_message(data, channel_id, message_id)
+        message.update({key: value for key, value in data.items() if key in ("content", "embeds", "components", "flags")})
+        message["edited_timestamp"] = _iso(time.time())
+        return message
+
+    def delete_message(self, data, channel_id, message_id):
+        self.get_message(data, channel_id, message_id)
+        del self.channels[channel_id][message_id]
+
+    def edit_member(self, data, guild_id, user_id):
+        if "channel_id" in data:
+            self.moves.append((guild_id, user_id, data["channel_id"])) # None = kicked from voice
+        return member_payload(user_id)
+
+    def interaction_callback(self, data, webhook_id, webhook_token):
+        kind = data.get("type")
+        body = data.get("data") or {}
+        message = self._message(self.interaction_channels.get(webhook_id, 0), body)
+        answer = self.answers.get(webhook_id)
+        if answer is not None and not answer.done():
+            answer.set_result(time.perf_counter())
+        return {
+            "interaction": {
+                "id": str(webhook_id), "type": 2, "response_message_id": message["id"],
+                "response_message_loading": kind == 5,
+                "response_message_ephemeral": bool((body.get("flags") or 0) & EPHEMERAL),
+            },
+            "resource": {"type": kind, "message": message},
+        }
+
+    def followup(self, data, webhook_id, webhook_token):
+        return self._message(0, data)
+
+    def edit_original(self, data, webhook_id, webhook_token, message_id):
+        return self._message(0, data)
@@ -0,0 +1,235 @@
+# End-to-end load test against the fake Discord in benchmarks/fake_discord.py (no network, no token).
+#
+# Boots the real BlushyBot (setup_hook, every cog, command sync) on a temp data.db,
+# seeds a guild with reset games, a voice disconnect job and reminders that fall
+# due while the test runs, then fires thousands of /remind_me, /reminders and
+# /cancel_reminder interactions through ConnectionState.parse_interaction_create
+# while auto_update (forced every few seconds) and the reminder loop keep working.
+# Reports command latency (dispatch -> interaction callback), API calls per route,
+# 429s and reminder delivery lateness (remind_at -> message received by the fake).
+# Fails if bot.close() leaves timers, queue tasks or DB threads behind.
+#
+#   python -m benchmarks.load_test --commands 3000 --rate 150 --reminders 2000
+import argparse
+import asyncio
+import collections
+import datetime
+import os
+import random
+import sys
+import threading
+import time
+
+import database
+from benchmarks._util import temp_db_path, percentile
+
+GUILD_ID = 1
+RESET_CHANNEL = 100
+TEXT_CHANNELS = 1000  # reminder channels are TEXT_CHANNELS + n
+VOICE_CHANNEL = 200
+USERS = 10_000  # user ids are USERS + n
+COMMAND_MIX = (("remind_me", 0.5), ("reminders", 0.3), ("cancel_reminder", 0.2))
+REMIND_TIMES = ("2h", "1d", "45m", "3d4h", "every 2h", "every day 20:00")
+
+
+async def seed(args, span: float):
+    """Games, a disconnect job and reminders; returns (start of the due window, cancellable reminder ids)."""
+    await database.init_db()
+    await database.set_guild_config(GUILD_ID, reset_channel_id=RESET_CHANNEL)
+    for g in range(args.games):
+        await database.add_game(GUILD_ID, f"Game {g}", g % 24, "Etc/GMT")
+
+    due_from = int(time.time()) + 5  # leave the bot a few seconds to boot
+    await database.add_disconnect_job(GUILD_ID, due_from + int(span / 2), VOICE_CHANNEL)
+
+    pool = await database.get_pool()
+    rows = []
+    for r in range(args.reminders):
+        # a tenth is already overdue (startup backlog), the rest falls due while commands are flowing
+        remind_at = due_from - random.randint(1, 60) if r % 10 == 0 else due_from + int(random.random() * span)
+        reason = f"backlog {r}" if remind_at < due_from else f"due {r}"
+        rows.append((str(USERS + r % args.users), reason, remind_at, str(TEXT_CHANNELS + r % args.channels), None))
+    # far-future reminders: /reminders pages through them, /cancel_reminder deletes them
+    for r in range(args.users * 3):
+        rows.append((str(USERS + r % args.users), f"later {r}", due_from + 86400 + r, str(TEXT_CHANNELS + r % args.channels), None))
+    async with pool.write() as db:
+        await db.executemany(
+            "INSERT INTO reminders (user_id, reason, remind_at, channel_id, recurring_interval) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+    async with pool.read() as db:
+        async with db.execute("SELECT id, user_id FROM reminders WHERE reason LIKE 'later %'") as cur:
+            cancellable = [(row[0], int(row[1])) for row in await cur.fetchall()]
+    return due_from, cancellable
+
+
+def pick_command(cancellable):
+    name = random.choices([name for name, _ in COMMAND_MIX], [weight for _, weight in COMMAND_MIX])[0]
+    if name == "remind_me":
+        when = random.choice(REMIND_TIMES)
+        if when.startswith("every"):
+            return name, None, {"reason": "load test", "every": when.removeprefix("every ")}
+        return name, None, {"reason": "load test", "time": when}
+    if name == "reminders":
+        return name, None, {"scope": random.choice(("mine", "mine", "channel"))}
+    if cancellable and random.random() < 0.8:
+        reminder_id, user_id = cancellable.pop(random.randrange(len(cancellable)))
+        return name, user_id, {"reminder_id": reminder_id}
+    return name, None, {"reminder_id": random.randint(10**8, 10**9)}  # someone else's / unknown id
+
+
+async def force_refreshes(bot, every: float, stop: asyncio.Event):
+    """Make every game due again, with stale fingerprints so each refresh is a real edit (like a reset boundary)."""
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), every)
+            return
+        except asyncio.TimeoutError:
+            pass
+        for game in await database.get_all_games(GUILD_ID):
+            msg_id, _ = await database.get_message_state(GUILD_ID, game)
+            if msg_id:
+                await database.save_message_id(GUILD_ID, game, msg_id, None)
+            bot.reset_scheduler.schedule((GUILD_ID, game), time.time(), (GUILD_ID, game))
+
+
+def reminder_lateness(fake):
+    """Seconds from remind_at (the embed timestamp) to the fake receiving the message, per seeded reminder kind."""
+    late = {"due": [], "backlog": []}
+    for received_at, channel_id, message in fake.sent:
+        for embed in message["embeds"]:
+            kind = embed.get("description", "").partition(" ")[0]
+            if embed.get("title") == "⏰ Reminder" and kind in late:
+                remind_at = datetime.datetime.fromisoformat(embed["timestamp"]).timestamp()
+                late[kind].append(received_at - remind_at)
+    return late
+
+
+def shutdown_leaks():
+    """Scheduler/outbound tasks and aiosqlite threads still alive after bot.close(); DB threads block interpreter exit."""
+    tasks = [
+        task.get_coro().__qualname__ for task in asyncio.all_tasks()
+        if task.get_coro().__qualname__.startswith(("DueScheduler.", "OutboundQueue."))
+    ]
+    threads = []
+    for thread in threading.enumerate():
+        if "_connection_worker_thread" in thread.name:
+            thread.join(1.0)  # a closed connection's thread exits right after close() returned
+            if thread.is_alive():
+                threads.append(thread.name)
+    return tasks + threads
+
+
+def fmt_ms(seconds):
+    if seconds is None:
+        return "       – ms"
+    return "   > max ms" if seconds == float("inf") else f"{seconds * 1000:8.1f} ms"
+
+
+async def run(args):
+    os.environ.update(TOKEN="load-test", METRICS_PORT="0", MAINTENANCE="0", CHANNEL_ID="0", FORCE_SYNC="0")
+    temp_db_path("load.db")
+    random.seed(args.seed)
+
+    # imported late: config reads the environment above
+    import main
+    from benchmarks.fake_discord import FakeDiscord
+    from dispatch import OutboundQueue
+    from metrics import LOOP_TICK, REMINDER_LATENESS, RATE_LIMITED
+
+    span = args.commands / args.rate
+    due_from, cancellable = await seed(args, span)
+
+    bot = main.bot
+    bot.outbound = OutboundQueue(route_per=args.window) # same pacing window as the fake's buckets
+    fake = FakeDiscord(latency=args.latency, route_window=args.window, inject_429=args.inject_429)
+    fake.install(bot)
+
+    started = time.perf_counter()
+    await bot.login("load-test") # setup_hook: DB, outbound queue, every cog, command sync
+    voice = [(USERS + u, VOICE_CHANNEL) for u in range(args.voice)]
+    fake.add_guild(GUILD_ID, [RESET_CHANNEL] + [TEXT_CHANNELS + c for c in range(args.channels)], [VOICE_CHANNEL], voice)
+    fake.ready(bot)
+    print(f"Bot ready after {time.perf_counter() - started:.2f}s, {len(fake.command_ids)} commands synced")
+
+    stop = asyncio.Event()
+    refresher = asyncio.create_task(force_refreshes(bot, args.refresh_every, stop))
+    await asyncio.sleep(max(0.0, due_from - time.time()))
+
+    latency = collections.defaultdict(list)
+    unanswered = collections.Counter()
+
+    async def invoke(name, user_id, options):
+        payload, answered = fake.command(name, user_id, TEXT_CHANNELS + random.randrange(args.channels), **options)
+        sent = time.perf_counter()
+        bot._connection.parse_interaction_create(payload) # what the gateway does with INTERACTION_CREATE
+        try:
+            latency[name].append(await asyncio.wait_for(answered, args.timeout) - sent)
+        except asyncio.TimeoutError:
+            unanswered[name] += 1
+
+    load_started = time.perf_counter()
+    tasks = []
+    for i in range(args.commands):
+        await asyncio.sleep(max(0.0, load_started + i / args.rate - time.perf_counter()))
+        name, user_id, options = pick_command(cancellable)
+        tasks.append(asyncio.create_task(invoke(name, user_id or USERS + random.randrange(args.users), options)))
+    await asyncio.gather(*tasks)
+    load_elapsed = time.perf_counter() - load_started
+
+    # let the last reminders fall due and drain through the outbound queue
+    deadline = time.time() + args.timeout
+    while sum(map(len, reminder_lateness(fake).values())) < args.reminders and time.time() < deadline:
+        await asyncio.sleep(0.5)
+    stop.set()
+    await refresher
+    late = reminder_lateness(fake)
+    outbound_stats = dict(bot.outbound.stats)
+    await bot.close()
+    leaks = shutdown_leaks()
+
+    print(f"{args.commands} commands at {args.rate}/s ({load_elapsed:.1f}s), {args.reminders} reminders due over "
+          f"{span:.0f}s in {args.channels} channels, {args.games} games refreshed every {args.refresh_every:g}s")
+    print("Command latency (dispatch -> interaction callback):")
+    for name, _ in COMMAND_MIX:
+        samples = latency[name]
+        print(f"  /{name:<16} {len(samples):5d} ok {unanswered[name]:3d} unanswered  "
+              f"p50 {fmt_ms(percentile(samples, 50))}  p99 {fmt_ms(percentile(samples, 99))}  "
+              f"max {fmt_ms(max(samples, default=0.0))}")
+    print("API calls:")
+    for route, count in sorted(fake.calls.items(), key=lambda item: -item[1]):
+        print(f"  {count:7d}  {route}")
+    print(f"  429s: {fake.rate_limited} from the route window, {fake.injected} injected; "
+          f"seen by the bot: {int(RATE_LIMITED.total())}; outbound queue: {outbound_stats}")
+    print(f"Reminder delivery: {sum(map(len, late.values()))}/{args.reminders} delivered, lateness (remind_at -> received):")
+    for kind, samples in late.items():
+        print(f"  {kind:<8} {len(samples):5d}  p50 {fmt_ms(percentile(samples, 50))}  p99 {fmt_ms(percentile(samples, 99))}  "
+              f"max {fmt_ms(max(samples, default=0.0))}")
+    print(f"  REMINDER_LATENESS metric: {REMINDER_LATENESS.count()} sent, "
+          f"p50 ≤ {fmt_ms(REMINDER_LATENESS.quantile(0.5))}  p99 ≤ {fmt_ms(REMINDER_LATENESS.quantile(0.99))}")
+    for (loop,) in LOOP_TICK.values:
+        print(f"  loop {loop:<16} {LOOP_TICK.count(loop):5d} ticks, p99 ≤ {fmt_ms(LOOP_TICK.quantile(0.99, loop))}")
+    print(f"Voice: {sum(1 for *_, channel in fake.moves if channel is None)}/{args.voice} members disconnected")
+    if leaks:
+        print(f"❌ Still running after bot.close(): {', '.join(leaks)}")
+        sys.stdout.flush()
+        os._exit(1)  # a plain exit would hang on the leaked DB threads
+    print("Shutdown clean: no timers, queue tasks or DB threads left")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commands", type=int, default=3000)
+    parser.add_argument("--rate", type=float, default=150.0, help="commands per second")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--channels", type=int, default=50)
+    parser.add_argument("--reminders", type=int, default=2000, help="seeded reminders falling due during the run")
+    parser.add_argument("--games", type=int, default=12)
+    parser.add_argument("--voice", type=int, default=20, help="members the disconnect job kicks")
+    parser.add_argument("--refresh-every", type=float, default=5.0, help="seconds between forced auto_update passes")
+    parser.add_argument("--latency", type=float, default=0.02, help="fake REST latency in seconds")
+    parser.add_argument("--window", type=float, default=5.0, help="per-channel rate limit window (5 requests each)")
+    parser.add_argument("--inject-429", type=float, default=0.02, help="share of channel requests answered with a 429")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
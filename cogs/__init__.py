@@ -0,0 +1,11 @@
+# cogs/
+# One discord.py extension per feature. Live state (schedulers, outbound queue, caches)
+# sits on the bot and in the plain modules, so `/reload` swaps code without losing timers.
+EXTENSIONS = (
+    "cogs.resets",
+    "cogs.reminders",
+    "cogs.voice",
+    "cogs.warframe",
+    "cogs.maintenance",
+    "cogs.admin",
+)
@@ -0,0 +1,105 @@
+# cogs/admin.py
+# Owner tools: runtime stats and hot reloads of the feature cogs.
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+import logs
+from cogs import EXTENSIONS
+from metrics import LOOP_TICK, DB_CALL, DB_CACHE, REMINDER_LATENESS, RATE_LIMITED, SCRAPER_CACHE, RELOAD
+
+log = logs.get_logger("admin")
+
+
+def _fmt_seconds(value):
+    if value is None:
+        return "–"
+    if value == float("inf"):
+        return "> max"
+    return f"{value * 1000:.0f}ms" if value < 1 else f"{value:.1f}s"
+
+
+class Admin(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        # guild admins only get to see the commands, reloading code and reading metrics is for the bot owner
+        if await self.bot.is_owner(interaction.user):
+            return True
+        await interaction.response.send_message("❌ Only the bot owner can use this.", ephemeral=True)
+        return False
+
+    @app_commands.command(name="stats", description="Show bot runtime metrics (owner only)")
+    @app_commands.default_permissions(administrator=True)
+    async def stats(self, interaction: discord.Interaction):
+        embed = discord.Embed(title="📈 Bot Stats", color=discord.Color.blurple())
+
+        loops = "\n".join(
+            f"`{loop}` — {LOOP_TICK.count(loop)} ticks, p50 ≤ {_fmt_seconds(LOOP_TICK.quantile(0.5, loop))}, "
+            f"p99 ≤ {_fmt_seconds(LOOP_TICK.quantile(0.99, loop))}"
+            for (loop,) in LOOP_TICK.values
+        )
+        embed.add_field(name="Loop ticks", value=loops or "No ticks yet.", inline=False)
+
+        slowest = sorted(DB_CALL.values, key=lambda labels: DB_CALL.quantile(0.99, *labels), reverse=True)[:5]
+        db_lines = "\n".join(
+            f"`{fn}` — {DB_CALL.count(fn)} calls, p99 ≤ {_fmt_seconds(DB_CALL.quantile(0.99, fn))}"
+            for (fn,) in slowest
+        )
+        embed.add_field(name="Slowest DB helpers", value=db_lines or "No DB calls yet.", inline=False)
+
+        embed.add_field(
+            name="Reminder lateness",
+            value=f"{REMINDER_LATENESS.count()} sent, p50 ≤ {_fmt_seconds(REMINDER_LATENESS.quantile(0.5))}, "
+                  f"p99 ≤ {_fmt_seconds(REMINDER_LATENESS.quantile(0.99))}",
+            inline=False
+        )
+
+        hits = SCRAPER_CACHE.values.get(("hit",), 0) + SCRAPER_CACHE.values.get(("stale",), 0)
+        lookups = SCRAPER_CACHE.total()
+        ratio = f"{hits / lookups:.0%}" if lookups else "–"
+        embed.add_field(name="429s", value=str(int(RATE_LIMITED.total())), inline=True)
+        embed.add_field(name="Scraper cache hit ratio", value=f"{ratio} of {int(lookups)}", inline=True)
+        cache_hits = sum(count for (_, result), count in DB_CACHE.values.items() if result == "hit")
+        cache_lookups = DB_CACHE.total()
+        cache_ratio = f"{cache_hits / cache_lookups:.0%}" if cache_lookups else "–"
+        embed.add_field(name="DB cache hit ratio", value=f"{cache_ratio} of {int(cache_lookups)}", inline=True)
+        embed.add_field(name="Ready after", value=_fmt_seconds(self.bot.ready_after), inline=True)
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="reload", description="Reload bot code without reconnecting (owner only)")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(extension="Feature to reload (default: all)")
+    @app_commands.choices(extension=[
+        app_commands.Choice(name=name.removeprefix("cogs."), value=name) for name in EXTENSIONS
+    ])
+    async def reload(self, interaction: discord.Interaction, extension: str = None):
+        await interaction.response.defer(ephemeral=True)
+        started = time.perf_counter()
+        lines = []
+        # schedulers, outbound queue and caches stay on the bot, only the cog code is swapped
+        for name in [extension] if extension else EXTENSIONS:
+            try:
+                if name in self.bot.extensions:
+                    await self.bot.reload_extension(name)
+                else:
+                    await self.bot.load_extension(name) # failed at startup, try again
+                lines.append(f"✅ `{name}`")
+            except commands.ExtensionError as e:
+                # reload_extension rolled back, the old code keeps running
+                log.exception("⚠️ Failed to reload %s", name, extra={"extension": name})
+                lines.append(f"❌ `{name}`: {e.__cause__ or e}")
+        await self.bot.sync_commands() # no-op unless a command signature changed
+
+        elapsed = time.perf_counter() - started
+        RELOAD.observe(elapsed, extension or "all")
+        log.info("🔄 Reloaded %s in %.2fs", extension or "all extensions", elapsed, extra={"latency": round(elapsed, 3)})
+        await interaction.followup.send("\n".join(lines) + f"\n🔄 took {_fmt_seconds(elapsed)}", ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Admin(bot))
@@ -0,0 +1,113 @@
+# cogs/maintenance.py
+# Background upkeep for data.db: online backups, delivery log pruning, incremental vacuum, ANALYZE.
+import contextlib
+import datetime
+import glob
+import os
+import time
+
+from discord.ext import commands
+
+import config
+import logs
+from database import (
+    get_bot_state,
+    set_bot_state,
+    backup_db,
+    prune_reminder_deliveries,
+    incremental_vacuum,
+    analyze_db
+)
+from metrics import LOOP_TICK
+
+log = logs.get_logger("maintenance")
+
+BACKUP_INTERVAL = 6 * 3600
+PRUNE_INTERVAL = 3600
+VACUUM_INTERVAL = 3600
+ANALYZE_INTERVAL = 24 * 3600
+FIRST_RUN_DELAY = 300  # overdue tasks wait until the startup burst (embed refresh, reminder backlog) is over
+
+
+class Maintenance(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.scheduler = bot.maintenance_scheduler  # lives on the bot, next runs survive a reload
+        self.tasks = {
+            "prune": (PRUNE_INTERVAL, self.prune),
+            "vacuum": (VACUUM_INTERVAL, self.vacuum),
+            "analyze": (ANALYZE_INTERVAL, self.analyze),
+        }
+        if config.BACKUP_DIR:
+            self.tasks["backup"] = (BACKUP_INTERVAL, self.backup)
+
+    async def cog_load(self):
+        self.scheduler.on_due = self.run_tasks
+        if config.MAINTENANCE and not self.scheduler.running:
+            await self.start() # only needs the DB, no reason to wait for on_ready
+
+    async def start(self):
+        # last runs are kept in bot_state, so restarts don't redo a backup that just happened
+        now = time.time()
+        for name, (interval, _) in self.tasks.items():
+            last = await get_bot_state(f"maintenance:{name}")
+            self.scheduler.schedule(name, max(float(last or 0) + interval, now + FIRST_RUN_DELAY), name)
+        self.scheduler.start()
+
+    async def run_tasks(self, due):
+        # one after another, they all want the writer
+        for _, name in due:
+            interval, task = self.tasks[name]
+            key = f"maintenance:{name}"
+            last = await get_bot_state(key)
+            if last and float(last) + interval > time.time() + 60:
+                # another process sharing data.db got there first
+                self.scheduler.schedule(name, float(last) + interval, name)
+                continue
+            try:
+                with LOOP_TICK.time(f"db_{name}"):
+                    await task()
+                await set_bot_state(key, str(int(time.time())))
+            except Exception:
+                log.exception("⚠️ Maintenance task %s failed", name, extra={"task": name})
+            self.scheduler.schedule(name, time.time() + interval, name)
+
+    # -----------------------------
+    # Tasks
+    # -----------------------------
+    async def backup(self):
+        os.makedirs(config.BACKUP_DIR, exist_ok=True)
+        path = os.path.join(config.BACKUP_DIR, datetime.datetime.now(datetime.timezone.utc).strftime("data-%Y%m%d-%H%M%S.db"))
+        started = time.perf_counter()
+        try:
+            await backup_db(path + ".part")
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path + ".part")
+            raise
+        os.replace(path + ".part", path) # only complete, checked copies get the .db name
+
+        for old in sorted(glob.glob(os.path.join(config.BACKUP_DIR, "data-*.db")))[:-max(1, config.BACKUP_KEEP)]:
+            os.remove(old)
+        log.info("💾 Backed up data.db to %s", path, extra={
+            "bytes": os.path.getsize(path), "latency": round(time.perf_counter() - started, 3)
+        })
+
+    async def prune(self):
+        before = int(time.time()) - config.DELIVERY_LOG_DAYS * 86400
+        removed = await prune_reminder_deliveries(before, config.DELIVERY_LOG_MAX_ROWS)
+        if removed:
+            log.info("🧹 Pruned %d reminder delivery log rows", removed, extra={"rows": removed})
+
+    async def vacuum(self):
+        released = await incremental_vacuum()
+        if released:
+            log.info("🧹 Released %d free pages", released, extra={"pages": released})
+
+    async def analyze(self):
+        await analyze_db()
+        log.debug("📊 Refreshed query planner statistics")
+
+
+async def setup(bot):
+    await bot.add_cog(Maintenance(bot))
@@ -0,0 +1,503 @@
+# cogs/reminders.py
+# /remind_me and friends, plus delivery: due rows are leased from the DB so any number
+# of bot/worker processes can share one data.db without double pings.
+import asyncio
+import datetime
+import re
+import time
+
+import discord
+import pytz
+from discord import app_commands
+from discord.ext import commands
+
+import config
+import logs
+from database import (
+    add_reminder,
+    apply_reminder_results,
+    claim_due_reminders,
+    next_reminder_lease_expiry,
+    renew_reminder_leases,
+    release_reminder_leases,
+    get_all_reminders,
+    get_reminders_page,
+    delete_user_reminder
+)
+from dispatch import PRIORITY_REMINDER
+from metrics import LOOP_TICK, REMINDER_LATENESS
+from recurrence import (
+    CalendarRule,
+    IntervalRule,
+    CATCH_UP_ALL,
+    CATCH_UP_POLICIES,
+    parse_rule,
+    rule_from_row,
+    plan_occurrence
+)
+
+log = logs.get_logger("reminders")
+
+REMINDER_CONCURRENCY = 5  # channels delivered to in parallel
+REMINDER_EMBEDS_PER_MESSAGE = 10  # Discord's embed limit per message
+REMINDER_CHARS_PER_MESSAGE = 6000  # Discord's limit on text across all embeds of one message
+REMINDERS_PER_PAGE = 10  # /reminders page size, well under the 25 field limit
+REMINDER_LEASE = 120  # seconds a claimed reminder stays reserved for this process (renewed while sending)
+REMINDER_CLAIM_BATCH = 500  # due rows leased per claim
+REMINDER_POLL = 15  # poll interval of workers and shard ranges when config.REMINDER_POLL isn't set
+REMINDER_RETRY = 60  # back-off after a failed send
+POLL_KEY = "poll"
+
+
+# -----------------------------
+# Utility
+# -----------------------------
+def parse_reminder_time(input_str: str):
+    now = datetime.datetime.now(pytz.timezone("Europe/Berlin"))
+
+    # 1️⃣ Absolute date
+    try:
+        absolute = datetime.datetime.strptime(input_str, "%d/%m/%Y %H:%M")
+        return pytz.timezone("Europe/Berlin").localize(absolute).astimezone(pytz.UTC)
+    except ValueError:
+        pass
+
+    # 2️⃣ Relative time: e.g., 1d2h15m, 2h30m, 45m
+    pattern = r"(?:(?P<days>\d+)d)?(?:(?P<hours>\d+)h)?(?:(?P<minutes>\d+)m)?"
+    match = re.fullmatch(pattern, input_str.strip())
+    if match:
+        days = int(match.group("days") or 0)
+        hours = int(match.group("hours") or 0)
+        minutes = int(match.group("minutes") or 0)
+        delta = datetime.timedelta(days=days, hours=hours, minutes=minutes)
+        target_time = now + delta
+        return target_time.astimezone(pytz.UTC)
+
+    raise ValueError("Invalid time format")
+
+def parse_remind_at(remind_at: int):
+    # reminders store remind_at as UTC epoch seconds
+    return datetime.datetime.fromtimestamp(remind_at, pytz.UTC)
+
+def format_german_time(dt_utc: datetime.datetime):
+    berlin = pytz.timezone("Europe/Berlin")
+    dt_local = dt_utc.astimezone(berlin)
+    today = datetime.datetime.now(berlin).date()
+    tomorrow = today + datetime.timedelta(days=1)
+
+    if dt_local.date() == today:
+        day_str = "heute"
+    elif dt_local.date() == tomorrow:
+        day_str = "morgen"
+    else:
+        day_str = dt_local.strftime("%d/%m/%Y")  # fallback
+
+    return f"{day_str} um {dt_local.strftime('%H:%M')} Uhr"
+
+# -----------------------------
+# Embeds
+# -----------------------------
+def build_reminder_embed(reason: str, remind_dt: datetime.datetime, missed: int = 0):
+    embed = discord.Embed(
+        title="⏰ Reminder",
+        description=reason[:4096], # slash options take up to 6000 characters, a description only 4096
+        color=discord.Color.blurple(),
+        timestamp=remind_dt
+    )
+    if missed:
+        embed.add_field(name="Missed while offline", value=f"{missed}x", inline=False)
+    embed.set_footer(text=f"made with UwU")
+    return embed
+
+def pack_reminder_batches(items):
+    """Split (reminder, embed) pairs of one channel into messages within the embed count and text limits."""
+    batches, batch, chars = [], [], 0
+    for reminder, embed in items:
+        size = len(embed)  # title, description, fields and footer, what Discord counts
+        if batch and (len(batch) >= REMINDER_EMBEDS_PER_MESSAGE or chars + size > REMINDER_CHARS_PER_MESSAGE):
+            batches.append(batch)
+            batch, chars = [], 0
+        batch.append((reminder, embed))
+        chars += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+def build_reminders_embed(all_reminders):
+    embed = discord.Embed(title="⏰ Current Reminders", color=discord.Color.blurple())
+
+    for reminder in all_reminders:
+        reminder_id, user_id, reason, remind_at, channel_id, recurring_interval, recurrence, catch_up = reminder
+        remind_dt = parse_remind_at(remind_at)
+
+        german_time = format_german_time(remind_dt)
+        rule = rule_from_row(recurring_interval, recurrence)
+        recurring_text = f" ({rule})" if rule else ""
+        embed.add_field(
+            name=f"🆔 {reminder_id} — <@{user_id}> – {german_time}{recurring_text}",
+            value=reason,
+            inline=False
+        )
+    return embed
+
+
+class ReminderPager(discord.ui.View):
+    """◀ / ▶ buttons over keyset-paginated reminder pages."""
+
+    def __init__(self, invoker_id: int, user_id: str = None, channel_id: str = None):
+        super().__init__(timeout=300)
+        self.invoker_id = invoker_id
+        self.user_id = user_id
+        self.channel_id = channel_id
+        self.cursors = [None]  # (remind_at, id) each page starts after; None = first page
+        self.rows = []
+
+    async def load(self):
+        rows = await get_reminders_page(
+            user_id=self.user_id,
+            channel_id=self.channel_id,
+            after=self.cursors[-1],
+            limit=REMINDERS_PER_PAGE + 1 # one extra row tells us if there is a next page
+        )
+        self.rows = rows[:REMINDERS_PER_PAGE]
+        self.previous_page.disabled = len(self.cursors) == 1
+        self.next_page.disabled = len(rows) <= REMINDERS_PER_PAGE
+        return self.rows
+
+    @property
+    def single_page(self):
+        return self.previous_page.disabled and self.next_page.disabled
+
+    def embed(self):
+        embed = build_reminders_embed(self.rows)
+        embed.set_footer(text=f"Page {len(self.cursors)}")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        return interaction.user.id == self.invoker_id
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.cursors.pop()
+        await self.load()
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        last = self.rows[-1]
+        self.cursors.append((last[3], last[0]))
+        await self.load()
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+
+class Reminders(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.scheduler = bot.reminder_scheduler  # lives on the bot, pending wake-ups survive a reload
+
+    async def cog_load(self):
+        self.scheduler.on_due = self.deliver_reminders
+        if self.bot.reminder_dispatch and not self.scheduler.running:
+            await self.load_reminders() # delivery starts in on_ready, once channels are cached
+            if self.bot.is_ready():
+                self.scheduler.start() # loaded after on_ready (first load via /reload)
+
+    @property
+    def poll_interval(self):
+        """Seconds between claims for rows other processes added, 0 = no polling.
+
+        REMINDER_POLL decides (redundant bots, bot + workers). Unset, only reminder_worker.py
+        and shard ranges poll: a lone bot schedules every reminder it adds in-process.
+        """
+        if config.REMINDER_POLL is not None:
+            return config.REMINDER_POLL
+        return REMINDER_POLL if self.bot.rest_only or not config.OWNS_ALL_SHARDS else 0
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if self.bot.reminder_dispatch:
+            self.scheduler.start() # no-op after a reload
+
+    # -----------------------------
+    # Delivery
+    # -----------------------------
+    # the scheduler only says *when* to look, due rows are then leased from the DB
+    async def deliver_reminders(self, due=()):
+        try:
+            with LOOP_TICK.time("reminder_loop"):
+                while True:
+                    claimed = await claim_due_reminders(
+                        self.bot.worker_id, int(time.time()), REMINDER_LEASE, REMINDER_CLAIM_BATCH,
+                        self.bot.foreign_channels
+                    )
+                    if claimed:
+                        await self._deliver_reminders(claimed)
+                    if len(claimed) < REMINDER_CLAIM_BATCH:
+                        break
+        except Exception:
+            # whatever we had leased comes back once the lease runs out, look again then
+            self.scheduler.schedule(POLL_KEY, time.time() + REMINDER_LEASE)
+            raise
+        wake_at = []
+        if self.poll_interval:
+            wake_at.append(time.time() + self.poll_interval)
+        # due rows someone else holds (or that back off after a failed send): look again once that runs out,
+        # their owner may have died and nothing else would wake us for them
+        lease_expires = await next_reminder_lease_expiry(int(time.time()), self.bot.foreign_channels)
+        if lease_expires is not None:
+            wake_at.append(lease_expires)
+        if wake_at:
+            self.scheduler.schedule(POLL_KEY, min(wake_at))
+
+    async def _keep_leases(self, reminder_ids):
+        """Extend our leases while a slow (rate limited) delivery is still running."""
+        while True:
+            await asyncio.sleep(REMINDER_LEASE / 3)
+            await renew_reminder_leases(self.bot.worker_id, reminder_ids, int(time.time()) + REMINDER_LEASE)
+
+    async def _send_reminder_batch(self, channel, batch):
+        """One message for the (reminder, embed) pairs that fell due together in the same channel."""
+        mentions = " ".join(dict.fromkeys(f"<@{reminder[1]}>" for reminder, _ in batch))
+        embeds = [embed for _, embed in batch]
+        batch = [reminder for reminder, _ in batch]
+        # Mention users in content to actually ping
+        await self.bot.outbound.submit(
+            channel.id,
+            lambda: channel.send(content=mentions, embeds=embeds),
+            priority=PRIORITY_REMINDER
+        )
+        sent_at = time.time()
+        for reminder in batch:
+            REMINDER_LATENESS.observe(max(0.0, sent_at - reminder[3]))
+        log.debug("⏰ Sent %d reminders", len(batch), extra={
+            "reminder_ids": [r[0] for r in batch], "channel_id": channel.id,
+            "latency": round(sent_at - min(r[3] for r in batch), 3)
+        })
+
+    async def _deliver_channel(self, channel_id, reminders, missed, semaphore):
+        """Send all due reminders of one channel; returns (reminder, status) for the ones that are done."""
+        bot = self.bot
+        if bot.rest_only:
+            channel = bot.get_partial_messageable(int(channel_id))
+        else:
+            channel = bot.get_channel(int(channel_id))
+        if not channel:
+            if config.OWNS_ALL_SHARDS:
+                return [(r, "dropped") for r in reminders] # channel is gone, drop/reschedule them like before
+            # another shard process owns it: hand the rows back and stop claiming this channel
+            bot.foreign_channels.add(channel_id)
+            await release_reminder_leases(bot.worker_id, [r[0] for r in reminders])
+            return []
+
+        done = []
+        batches = pack_reminder_batches(
+            (r, build_reminder_embed(r[2], parse_remind_at(r[3]), missed.get(r[0], 0))) for r in reminders
+        )
+        while batches:
+            items = batches.pop(0)
+            batch = [reminder for reminder, _ in items]
+            try:
+                async with semaphore:
+                    await self._send_reminder_batch(channel, items)
+                done.extend((r, "sent") for r in batch)
+            except (discord.NotFound, discord.Forbidden):
+                done.extend((r, "dropped") for r in batch) # channel deleted or bot removed, same as a missing channel
+            except discord.HTTPException as e:
+                if 400 <= e.status < 500 and e.status != 429:
+                    # Discord won't take this payload, sending it again in a minute would fail the same way
+                    if len(items) > 1:
+                        batches[:0] = [[item] for item in items] # one by one, only the bad one gets dropped
+                        continue
+                    log.warning("⚠️ Dropped reminder Discord rejected: %s", e, extra={
+                        "reminder_ids": [r[0] for r in batch], "channel_id": channel.id, "status": e.status
+                    })
+                    done.extend((r, "dropped") for r in batch)
+                    continue
+                # back off for everyone, the lease is released so any instance may retry
+                log.warning("⚠️ Failed to send reminders: %s", e, extra={
+                    "reminder_ids": [r[0] for r in batch], "channel_id": channel.id, "status": e.status
+                })
+                retry_at = int(time.time()) + REMINDER_RETRY
+                await release_reminder_leases(bot.worker_id, [r[0] for r in batch], retry_at) # deliver_reminders wakes up for it
+        return done
+
+    async def _deliver_reminders(self, reminders):
+        now = int(time.time())
+        by_channel = {}
+        next_due = {}  # reminder id -> next remind_at, only for recurring reminders
+        missed = {}  # reminder id -> skipped occurrences to mention ("all" catch-up)
+        skipped = []  # recurring reminders not sent because of their catch-up policy
+        for reminder in reminders:
+            rule = rule_from_row(reminder[5], reminder[6])
+            if rule is not None:
+                # jump straight past everything missed while offline
+                send, missed_count, next_due[reminder[0]] = plan_occurrence(rule, reminder[3], now, reminder[7])
+                if not send:
+                    skipped.append(reminder)
+                    continue
+                if reminder[7] == CATCH_UP_ALL and missed_count:
+                    missed[reminder[0]] = missed_count
+            by_channel.setdefault(reminder[4], []).append(reminder)
+
+        # fan out across channels, the outbound queue still paces each channel
+        semaphore = asyncio.Semaphore(REMINDER_CONCURRENCY)
+        keeper = asyncio.create_task(self._keep_leases([r[0] for r in reminders]))
+        try:
+            results = await asyncio.gather(*(
+                self._deliver_channel(channel_id, channel_reminders, missed, semaphore)
+                for channel_id, channel_reminders in by_channel.items()
+            ))
+        finally:
+            keeper.cancel()
+
+        deleted, rescheduled = [], []
+        outcomes = [(r, "skipped") for r in skipped] + [item for done in results for item in done]
+        for reminder, _ in outcomes:
+            # Handle recurring reminders
+            if reminder[0] in next_due:
+                rescheduled.append(reminder[:3] + (next_due[reminder[0]],) + reminder[4:])
+            else:
+                deleted.append(reminder[0])
+
+        # one transaction for the whole batch (plus its delivery log rows), also ends our leases
+        await apply_reminder_results(
+            deleted, [(r[0], r[3]) for r in rescheduled], self.bot.worker_id,
+            deliveries=[(r[0], status) for r, status in outcomes]
+        )
+        for reminder in rescheduled:
+            self.schedule_reminder(reminder)
+
+    def schedule_reminder(self, reminder):
+        # wake-up hint for exact timing, delivery itself goes through claim_due_reminders
+        if not self.bot.reminder_dispatch:
+            return # REMINDER_DISPATCH=0: the scheduler never runs here, the workers find the row in the DB
+        self.scheduler.schedule(reminder[0], reminder[3], reminder)
+
+    # load pending reminders into the scheduler (once at startup, other processes' new rows are found by polling)
+    async def load_reminders(self):
+        for reminder in await get_all_reminders():
+            self.schedule_reminder(reminder)
+        self.scheduler.schedule(POLL_KEY, time.time()) # first claim right away: overdue rows, expired leases
+        log.info("⏰ Scheduled %d reminders", len(self.scheduler) - 1)
+
+    # -----------------------------
+    # Slash Commands
+    # -----------------------------
+    @app_commands.command(name="remind_me", description="Set a reminder")
+    @app_commands.describe(
+        time="DD/MM/YYYY HH:MM or relative like 1d2h30m (optional for daily/weekly repeats)",
+        every="Repeat: e.g. 2h, day 20:00, mon,fri 08:30 Europe/Berlin",
+        catch_up="Missed repeats while the bot was offline: skip, send one, or send one with a count"
+    )
+    @app_commands.choices(catch_up=[
+        app_commands.Choice(name=policy, value=policy) for policy in CATCH_UP_POLICIES
+    ])
+    async def remind_me(self, interaction: discord.Interaction, reason: str, time: str = None, every: str = None, catch_up: str = "one"):
+        try:
+            rule = parse_rule(every if every.lower().startswith(("every", "daily")) else f"every {every}") if every else None
+            now_utc = datetime.datetime.now(pytz.UTC)
+
+            # Parse time (absolute or relative), repeats without one start at their next occurrence
+            if time:
+                remind_time_utc = parse_reminder_time(time)
+            elif isinstance(rule, CalendarRule):
+                remind_time_utc = datetime.datetime.fromtimestamp(rule.next_after(int(now_utc.timestamp())), pytz.UTC)
+            elif isinstance(rule, IntervalRule):
+                remind_time_utc = now_utc + datetime.timedelta(seconds=rule.seconds)
+            else:
+                raise ValueError("Either time or every is required")
+
+            recurring_interval = rule.seconds if isinstance(rule, IntervalRule) else None
+            recurrence = str(rule) if isinstance(rule, CalendarRule) else None
+
+            # Save reminder in DB
+            reminder_id = await add_reminder(
+                str(interaction.user.id),
+                reason,
+                remind_time_utc,
+                str(interaction.channel.id),
+                recurring_interval,
+                recurrence,
+                catch_up
+            )
+            self.schedule_reminder((
+                reminder_id,
+                str(interaction.user.id),
+                reason,
+                int(remind_time_utc.timestamp()),
+                str(interaction.channel.id),
+                recurring_interval,
+                recurrence,
+                catch_up
+            ))
+
+            # Human-readable relative time
+            delta = remind_time_utc - now_utc
+            total_minutes = int(delta.total_seconds() // 60)
+            days, remainder = divmod(total_minutes, 1440)  # 1440 = 24*60
+            hours, minutes = divmod(remainder, 60)
+
+            parts = []
+            if days:
+                parts.append(f"{days}d")
+            if hours:
+                parts.append(f"{hours}h")
+            if minutes:
+                parts.append(f"{minutes}m")
+            human_relative = "".join(parts)
+
+            german_time = format_german_time(remind_time_utc)
+            repeat_text = f", repeats {rule}" if rule else ""
+
+            # Confirm to user
+            await interaction.response.send_message(
+                f"✅ Reminder set for **{german_time}** ({human_relative} from now{repeat_text}): {reason}",
+                ephemeral=True
+            )
+
+        except ValueError:
+            await interaction.response.send_message(
+                "❌ Invalid time format! Use either DD/MM/YYYY HH:MM or relative time like 1d2h30m, "
+                "and repeats like `2h`, `day 20:00` or `mon,fri 08:30 Europe/Berlin`.",
+                ephemeral=True
+            )
+
+    @app_commands.command(name="reminders", description="List current reminders")
+    @app_commands.describe(scope="Your own reminders (default) or all reminders in this channel")
+    @app_commands.choices(scope=[
+        app_commands.Choice(name="mine", value="mine"),
+        app_commands.Choice(name="this channel", value="channel"),
+    ])
+    async def reminders(self, interaction: discord.Interaction, scope: str = "mine"):
+        if scope == "channel":
+            pager = ReminderPager(interaction.user.id, channel_id=str(interaction.channel.id))
+        else:
+            pager = ReminderPager(interaction.user.id, user_id=str(interaction.user.id))
+
+        if not await pager.load():
+            await interaction.response.send_message("📭 No reminders currently set.")
+            return
+
+        if pager.single_page:
+            await interaction.response.send_message(embed=pager.embed())
+        else:
+            await interaction.response.send_message(embed=pager.embed(), view=pager)
+
+    @app_commands.command(name="cancel_reminder", description="Cancel one of your reminders")
+    async def cancel_reminder(self, interaction: discord.Interaction, reminder_id: int):
+        if not await delete_user_reminder(reminder_id, str(interaction.user.id)):
+            await interaction.response.send_message(
+                "❌ Reminder not found or you don’t have permission to delete it.",
+                ephemeral=True
+            )
+            return
+
+        self.scheduler.cancel(reminder_id)
+        await interaction.response.send_message(
+            f"🗑️ Reminder **{reminder_id}** has been cancelled.",
+            ephemeral=True
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(Reminders(bot))
@@ -0,0 +1,315 @@
+# cogs/resets.py
+# Game reset embeds: one message per game or a compact dashboard, refreshed at each reset.
+import asyncio
+import hashlib
+import json
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+import config
+import logs
+from database import (
+    get_guild_config,
+    get_all_guild_configs,
+    set_guild_config,
+    claim_legacy_games,
+    get_all_games,
+    add_game,
+    remove_game,
+    get_message_state,
+    save_message_id,
+    take_game_messages,
+    get_dashboard_messages,
+    save_dashboard_message,
+    delete_dashboard_messages
+)
+from dispatch import PRIORITY_REFRESH
+from metrics import LOOP_TICK
+from recurrence import reset_rule
+
+log = logs.get_logger("resets")
+
+EMBEDS_PER_MESSAGE = 10  # Discord's embed limit per message
+DASHBOARD_FIELDS_PER_EMBED = 25  # Discord's field limit per embed
+DASHBOARD_CHARS_PER_MESSAGE = 6000  # Discord's limit on text across all embeds of one message
+RESET_GRACE = 2  # seconds after a reset boundary before the embed is re-rendered
+
+
+# -----------------------------
+# Utility
+# -----------------------------
+def get_next_reset(reset_hour, tz, now=None):
+    # cached daily rule per (hour, zone); localizes the wall-clock reset so DST days are right
+    return reset_rule(reset_hour, tz).next_after(int(time.time() if now is None else now))
+
+def embed_fingerprint(embed: discord.Embed):
+    # stable hash of what Discord would render, used to skip no-op edits
+    payload = json.dumps(embed.to_dict(), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+# -----------------------------
+# Embeds
+# -----------------------------
+def build_reset_embed(game: str, info: dict):
+    reset_timestamp = get_next_reset(info["reset_hour"], info["tz"])
+    embed = discord.Embed(title=f"{game} Daily Reset", color=discord.Color.blurple())
+    embed.add_field(
+        name="Next Reset",
+        value=f"<t:{reset_timestamp}:R> (<t:{reset_timestamp}:t>)",
+        inline=False
+    )
+    if info["icon"]:
+        embed.set_thumbnail(url=info["icon"])
+    return embed
+
+def build_dashboard_pages(games: dict):
+    """All games as fields, soonest reset first, packed into as few messages as the embed limits allow.
+
+    Returns one list of embeds per message.
+    """
+    resets = sorted((get_next_reset(info["reset_hour"], info["tz"]), game) for game, info in games.items())
+    pages, embeds, chars = [], [], 0
+    for reset_timestamp, game in resets:
+        name = game[:256]
+        value = f"<t:{reset_timestamp}:R> (<t:{reset_timestamp}:t>)"
+        new_embed = not embeds or len(embeds[-1].fields) >= DASHBOARD_FIELDS_PER_EMBED
+        if embeds and (chars + len(name) + len(value) > DASHBOARD_CHARS_PER_MESSAGE
+                       or (new_embed and len(embeds) >= EMBEDS_PER_MESSAGE)):
+            pages.append(embeds)
+            embeds, chars, new_embed = [], 0, True
+        if new_embed:
+            title = "🕒 Daily Resets" if not pages and not embeds else None
+            embeds.append(discord.Embed(title=title, color=discord.Color.blurple()))
+            chars += len(title or "")
+        embeds[-1].add_field(name=name, value=value, inline=True)
+        chars += len(name) + len(value)
+    if embeds:
+        pages.append(embeds)
+    return pages
+
+
+class Resets(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.scheduler = bot.reset_scheduler  # lives on the bot, pending resets survive a reload
+
+    async def cog_load(self):
+        self.scheduler.on_due = self.refresh_resets
+        if self.bot.is_ready():
+            await self.start() # loaded after on_ready (first load via /reload)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        await self.start() # refresh embeds at each game's reset boundary
+
+    # -----------------------------
+    # Core Bot Logic
+    # -----------------------------
+    async def _upsert_message(self, channel, msg_id, label: str, **content):
+        """Edit msg_id in place (no fetch) or post a new message; returns the message id."""
+        # the outbound queue paces these per channel, no manual cooldown needed anymore
+        outbound = self.bot.outbound
+        started = time.perf_counter()
+        if msg_id:
+            partial = channel.get_partial_message(msg_id)
+            try:
+                await outbound.submit(
+                    channel.id,
+                    lambda: partial.edit(**content),
+                    priority=PRIORITY_REFRESH,
+                    coalesce_key=("edit", msg_id)
+                )
+                log.info("✏️ Updated message for %s", label, extra={
+                    "game": label, "message_id": msg_id, "latency": round(time.perf_counter() - started, 3)
+                })
+                return msg_id
+            except discord.NotFound:
+                pass
+        msg = await outbound.submit(channel.id, lambda: channel.send(**content), priority=PRIORITY_REFRESH)
+        log.info("♻️ Recreated message for %s" if msg_id else "✅ Created message for %s", label, extra={
+            "game": label, "message_id": msg.id, "latency": round(time.perf_counter() - started, 3)
+        })
+        return msg.id
+
+    async def _delete_messages(self, channel, msg_ids):
+        for msg_id in msg_ids:
+            partial = channel.get_partial_message(msg_id)
+            try:
+                await self.bot.outbound.submit(channel.id, lambda: partial.delete(), priority=PRIORITY_REFRESH)
+            except discord.HTTPException:
+                pass # already gone
+
+    async def update_or_create_messages(self, guild_id: int, only=None):
+        config_row = await get_guild_config(guild_id)
+        channel = self.bot.get_channel(config_row["reset_channel_id"]) if config_row and config_row["reset_channel_id"] else None
+        if not channel:
+            log.warning("⚠️ Reset channel not found for guild %s", guild_id, extra={"guild_id": guild_id})
+            return
+
+        if config_row["dashboard"]:
+            await self.update_dashboard(guild_id, channel, migrate=only is None)
+            return
+
+        # full pass after switching back from dashboard mode: reuse the dashboard messages for games
+        spare = await delete_dashboard_messages(guild_id) if only is None else []
+
+        GAMES = await get_all_games(guild_id)
+        if only is not None:
+            GAMES = {game: info for game, info in GAMES.items() if game in only}
+
+        for game, info in GAMES.items():
+            embed = build_reset_embed(game, info)
+            fingerprint = embed_fingerprint(embed)
+            msg_id, last_fingerprint = await get_message_state(guild_id, game)
+            if msg_id and fingerprint == last_fingerprint:
+                continue # nothing changed since the last edit, don't touch the API
+            if not msg_id and spare:
+                msg_id = spare.pop(0)
+
+            msg_id = await self._upsert_message(channel, msg_id, game, embed=embed)
+            await save_message_id(guild_id, game, msg_id, fingerprint)
+
+        await self._delete_messages(channel, spare)
+        log.debug("✅ Updated all messages for guild %s", guild_id, extra={"guild_id": guild_id})
+
+    async def update_guild(self, guild_id: int, only=None):
+        """update_or_create_messages, but a broken reset channel (deleted, no access) only affects its own guild."""
+        try:
+            await self.update_or_create_messages(guild_id, only=only)
+        except Exception:
+            log.exception("⚠️ Failed to update reset messages for guild %s", guild_id, extra={"guild_id": guild_id})
+
+    async def update_dashboard(self, guild_id: int, channel, migrate: bool = False):
+        """Compact mode: every game in one message (or a few under the embed limits), one edit per refresh."""
+        # on full passes the per-game messages of the normal mode are taken over as dashboard pages
+        spare = await take_game_messages(guild_id) if migrate else []
+        stored = await get_dashboard_messages(guild_id)
+        pages = build_dashboard_pages(await get_all_games(guild_id))
+
+        for page, embeds in enumerate(pages):
+            fingerprint = hashlib.sha1("".join(embed_fingerprint(embed) for embed in embeds).encode("utf-8")).hexdigest()
+            msg_id, last_fingerprint = stored.get(page, (None, None))
+            if msg_id and fingerprint == last_fingerprint:
+                continue
+            if not msg_id and spare:
+                msg_id = spare.pop(0)
+
+            msg_id = await self._upsert_message(channel, msg_id, f"dashboard page {page + 1}", embeds=embeds)
+            await save_dashboard_message(guild_id, page, msg_id, fingerprint)
+
+        # fewer games than before: drop pages that are no longer needed
+        await self._delete_messages(channel, spare + await delete_dashboard_messages(guild_id, from_page=len(pages)))
+        log.debug("✅ Updated dashboard for guild %s", guild_id, extra={"guild_id": guild_id, "pages": len(pages)})
+
+    # -----------------------------
+    # Scheduling
+    # -----------------------------
+    # wakes at the next reset of any game and refreshes only those games
+    async def refresh_resets(self, due):
+        by_guild = {}
+        for _, (guild_id, game) in due:
+            by_guild.setdefault(guild_id, set()).add(game)
+        with LOOP_TICK.time("auto_update"):
+            try:
+                # guilds refresh side by side, the outbound queue paces each channel
+                await asyncio.gather(*(self.update_guild(guild_id, only=games) for guild_id, games in by_guild.items()))
+            finally:
+                await self.schedule_resets() # the games that just fired need their next timer no matter what
+
+    async def reset_guild_ids(self):
+        """Guilds with a reset channel that this process (shard range) is connected to."""
+        configs = await get_all_guild_configs()
+        return [gid for gid, row in configs.items() if row["reset_channel_id"] and self.bot.get_guild(gid)]
+
+    async def schedule_resets(self, guild_ids=None):
+        """Put every game without a pending timer on its next reset (also picks up new games)."""
+        if guild_ids is None:
+            guild_ids = await self.reset_guild_ids()
+        for guild_id in guild_ids:
+            for game, info in (await get_all_games(guild_id)).items():
+                key = (guild_id, game)
+                if key not in self.scheduler:
+                    reset_at = get_next_reset(info["reset_hour"], info["tz"])
+                    self.scheduler.schedule(key, reset_at + RESET_GRACE, key)
+
+    async def claim_legacy_setup(self):
+        """Move the old CHANNEL_ID setup (unscoped games) into that channel's guild."""
+        channel = self.bot.get_channel(config.CHANNEL_ID)
+        if not channel:
+            return
+        moved = await claim_legacy_games(channel.guild.id, config.CHANNEL_ID)
+        if moved:
+            log.info("📦 Assigned %d legacy games to %s", moved, channel.guild.name, extra={"guild_id": channel.guild.id})
+
+    async def start(self):
+        if self.scheduler.running:
+            return # gateway reconnect or reload, timers are still pending
+        if config.CHANNEL_ID:
+            await self.claim_legacy_setup()
+        guild_ids = await self.reset_guild_ids()
+        with LOOP_TICK.time("auto_update"):
+            # full pass once, fingerprints skip unchanged embeds
+            await asyncio.gather(*(self.update_guild(guild_id) for guild_id in guild_ids))
+        await self.schedule_resets(guild_ids)
+        self.scheduler.start()
+
+    # -----------------------------
+    # Server setup (per guild)
+    # -----------------------------
+    @app_commands.command(name="setup_resets", description="Post the game reset dashboard in this channel")
+    @app_commands.default_permissions(manage_guild=True)
+    async def setup_resets(self, interaction: discord.Interaction, channel: discord.TextChannel = None):
+        channel = channel or interaction.channel
+        await set_guild_config(interaction.guild.id, reset_channel_id=channel.id)
+        await interaction.response.send_message(f"✅ Game resets will be posted in {channel.mention}", ephemeral=True)
+        await self.update_or_create_messages(interaction.guild.id)
+        await self.schedule_resets([interaction.guild.id])
+
+    @app_commands.command(name="add_game", description="Add a game to this server's reset dashboard")
+    @app_commands.default_permissions(manage_guild=True)
+    @app_commands.describe(reset_hour="Hour of the daily reset (0-23)", tz="Time zone, e.g. Europe/Berlin or Etc/GMT-8")
+    async def add_game_command(self, interaction: discord.Interaction, name: str, reset_hour: int, tz: str = "Etc/GMT", icon: str = None):
+        try:
+            reset_rule(reset_hour, tz)  # validates hour + zone
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+            return
+
+        guild_id = interaction.guild.id
+        await add_game(guild_id, name, reset_hour, tz, icon)
+        await interaction.response.send_message(f"✅ Added **{name}** (resets {reset_hour:02d}:00 {tz})", ephemeral=True)
+        await self.update_or_create_messages(guild_id, only={name})
+        await self.schedule_resets([guild_id])
+
+    @app_commands.command(name="remove_game", description="Remove a game from this server's reset dashboard")
+    @app_commands.default_permissions(manage_guild=True)
+    async def remove_game_command(self, interaction: discord.Interaction, name: str):
+        guild_id = interaction.guild.id
+        config_row = await get_guild_config(guild_id)
+        msg_id, _ = await get_message_state(guild_id, name)
+        await remove_game(guild_id, name)
+        self.scheduler.cancel((guild_id, name))
+        await interaction.response.send_message(f"🗑️ Removed **{name}**", ephemeral=True)
+
+        channel = self.bot.get_channel(config_row["reset_channel_id"]) if config_row and config_row["reset_channel_id"] else None
+        if channel and config_row["dashboard"]:
+            await self.update_dashboard(guild_id, channel)
+        elif channel and msg_id:
+            await self._delete_messages(channel, [msg_id])
+
+    @app_commands.command(name="dashboard_mode", description="Show all game resets in one compact message instead of one per game")
+    @app_commands.default_permissions(manage_guild=True)
+    async def dashboard_mode(self, interaction: discord.Interaction, enabled: bool):
+        await set_guild_config(interaction.guild.id, dashboard=enabled)
+        await interaction.response.send_message(
+            "✅ Dashboard mode on, all games share one message" if enabled else "✅ Dashboard mode off, one message per game",
+            ephemeral=True
+        )
+        await self.update_or_create_messages(interaction.guild.id) # full pass moves the existing messages over
+
+
+async def setup(bot):
+    await bot.add_cog(Resets(bot))
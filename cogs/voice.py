@@ -0,0 +1,161 @@
+# cogs/voice.py
+# Scheduled voice disconnects, stored in the DB so restarts and reloads don't drop them.
+import asyncio
+import datetime
+import time
+
+import discord
+import pytz
+from discord import app_commands
+from discord.ext import commands
+
+import config
+import logs
+from database import (
+    get_guild_config,
+    set_guild_config,
+    add_disconnect_job,
+    get_disconnect_jobs,
+    delete_disconnect_job,
+    delete_guild_disconnect_jobs
+)
+from recurrence import DEFAULT_TZ, get_zone
+
+log = logs.get_logger("voice")
+
+DISCONNECT_CONCURRENCY = 5  # parallel move_to(None) calls per sweep
+DISCONNECT_MAX_LATE = 600  # drop restored disconnect jobs that are more than 10 min overdue
+
+
+async def _disconnect_member(member, semaphore):
+    async with semaphore:
+        try:
+            await member.move_to(None)
+            return True
+        except discord.HTTPException as e:
+            log.warning("⚠️ Failed to disconnect %s: %s", member, e, extra={"member_id": member.id, "status": e.status})
+            return False
+
+
+class Voice(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.scheduler = bot.disconnect_scheduler  # lives on the bot, pending jobs survive a reload
+
+    async def cog_load(self):
+        self.scheduler.on_due = self.run_disconnects
+        if self.bot.is_ready():
+            await self.start() # loaded after on_ready (first load via /reload)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        await self.start() # restore scheduled voice disconnects
+
+    # voice disconnect jobs (called by the scheduler, restored from the DB at startup)
+    async def run_disconnect_job(self, job):
+        job_id, guild_id, run_at, channel_id, member_id = job
+        guild = self.bot.get_guild(guild_id)
+        if not guild and not config.OWNS_ALL_SHARDS:
+            return # another shard process's guild (or it isn't back yet): its job, never ours to delete
+        if guild:
+            if channel_id:
+                channel = guild.get_channel(channel_id)
+                channels = [channel] if channel else []
+            else:
+                channels = guild.voice_channels
+            members = [m for vc in channels for m in vc.members if member_id is None or m.id == member_id]
+
+            # parallel but bounded, discord.py still queues each request on its rate-limit bucket
+            semaphore = asyncio.Semaphore(DISCONNECT_CONCURRENCY)
+            results = await asyncio.gather(*(_disconnect_member(m, semaphore) for m in members))
+            log.info("🔌 Disconnected %d/%d members in %s", sum(results), len(members), guild.name, extra={
+                "guild_id": guild_id, "job_id": job_id
+            })
+        await delete_disconnect_job(job_id)
+
+    async def run_disconnects(self, due):
+        await asyncio.gather(*(self.run_disconnect_job(job) for _, job in due))
+
+    async def load_disconnect_jobs(self):
+        now = time.time()
+        for job in await get_disconnect_jobs():
+            if not config.OWNS_ALL_SHARDS and not self.bot.get_guild(job[1]):
+                continue # served by another shard process, it restores its own jobs
+            if job[2] < now - DISCONNECT_MAX_LATE:
+                await delete_disconnect_job(job[0]) # missed while offline, kicking people hours later would be rude
+                continue
+            self.scheduler.schedule(job[0], job[2], job) # slightly overdue jobs run right away
+
+    async def start(self):
+        if self.scheduler.running:
+            return # gateway reconnect or reload, jobs are still pending
+        await self.load_disconnect_jobs()
+        self.scheduler.start()
+
+    # -----------------------------
+    # Slash Commands
+    # -----------------------------
+    @app_commands.command(name="disconnect", description="Schedule a voice disconnect at a given time (HH:MM 24h, server time zone)")
+    @app_commands.describe(
+        channel="Only disconnect this voice channel (default: all)",
+        member="Only disconnect this member (default: everyone)"
+    )
+    async def disconnect(
+        self,
+        interaction: discord.Interaction,
+        time: str,
+        channel: discord.VoiceChannel = None,
+        member: discord.Member = None
+    ):
+        config = await get_guild_config(interaction.guild.id)
+        tz = get_zone(config["disconnect_tz"] if config else DEFAULT_TZ)
+        try:
+            target_time = datetime.datetime.strptime(time, "%H:%M").time()
+            now = datetime.datetime.now(tz)
+            target_datetime = tz.localize(datetime.datetime.combine(now.date(), target_time))
+            if target_datetime <= now:
+                target_datetime += datetime.timedelta(days=1)
+        except ValueError:
+            await interaction.response.send_message("❌ Invalid time format! Use HH:MM (24h).")
+            return
+
+        run_at = int(target_datetime.timestamp())
+        channel_id = channel.id if channel else None
+        member_id = member.id if member else None
+
+        # stored in the DB so a restart doesn't drop it; replaces a pending job with the same target
+        job_id, replaced = await add_disconnect_job(interaction.guild.id, run_at, channel_id, member_id, interaction.user.id)
+        for old_id in replaced:
+            self.scheduler.cancel(old_id)
+        self.scheduler.schedule(job_id, run_at, (job_id, interaction.guild.id, run_at, channel_id, member_id))
+
+        who = member.mention if member else "everyone"
+        where = f" in {channel.mention}" if channel else " in voice"
+        await interaction.response.send_message(
+            f"✅ Will disconnect {who}{where} at **{target_time.strftime('%H:%M')}**"
+        )
+
+    @app_commands.command(name="cancel_disconnect", description="Cancel the scheduled voice disconnect for this server")
+    async def cancel_disconnect(self, interaction: discord.Interaction):
+        job_ids = await delete_guild_disconnect_jobs(interaction.guild.id)
+        for job_id in job_ids:
+            self.scheduler.cancel(job_id)
+        if job_ids:
+            await interaction.response.send_message("❌ Scheduled disconnect has been cancelled.")
+        else:
+            await interaction.response.send_message("ℹ️ No disconnect is currently scheduled.")
+
+    @app_commands.command(name="set_timezone", description="Set the time zone /disconnect uses on this server")
+    @app_commands.default_permissions(manage_guild=True)
+    async def set_timezone(self, interaction: discord.Interaction, tz: str):
+        try:
+            get_zone(tz)
+        except pytz.UnknownTimeZoneError:
+            await interaction.response.send_message(f"❌ Unknown time zone {tz}", ephemeral=True)
+            return
+        await set_guild_config(interaction.guild.id, disconnect_tz=tz)
+        await interaction.response.send_message(f"✅ /disconnect now uses **{tz}**", ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Voice(bot))
@@ -0,0 +1,72 @@
+# cogs/warframe.py
+# /prime_schedule, served from prime_scraper's cache (which outlives reloads of this cog).
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from prime_scraper import prime_cache, get_prime_schedule_cached
+
+
+class Warframe(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        if prime_cache.data is None:
+            await prime_cache.load() # warm prime schedule from the DB
+
+    # warframe prime command
+    @app_commands.command(name="prime_schedule", description="Shows the current Warframe Prime release order")
+    async def primes(self, interaction: discord.Interaction):
+        await interaction.response.defer()
+
+        try:
+            confirmed, primes = await get_prime_schedule_cached()
+
+            embed = discord.Embed(
+                title="Warframe Prime Release Schedule",
+                color=0xE0C16F
+            )
+
+            # cOwOnfirmed Prime at top
+            if confirmed:
+                embed.add_field(
+                    name="Next Confirmed Prime Frame:",
+                    value=f"**{confirmed}**",
+                    inline=False
+                )
+            else:
+                embed.add_field(
+                    name="Next Confirmed Prime Frame:",
+                    value="No confirmed Prime announced yet.",
+                    inline=False
+                )
+
+            # space
+            #embed.add_field(name="\u200b", value="\u200b", inline=False)
+
+            # full predicted list :3
+            formatted_lines = [
+                f"**{name} Prime** — {date}"
+                for name, date in primes
+            ]
+
+            embed.add_field(
+                name="Predicted Release Order",
+                value="\n".join(formatted_lines),
+                inline=False
+            )
+
+            embed.set_footer(text="Source: jwflab.com | Auto-updated hourly")
+
+            await interaction.followup.send(embed=embed)
+
+        except Exception as e:
+            await interaction.followup.send(
+                f"Error fetching data: {e}",
+                ephemeral=True
+            )
+
+
+async def setup(bot):
+    await bot.add_cog(Warframe(bot))
@@ -0,0 +1,59 @@
+# config.py
+# .env settings shared by main.py, the cogs and reminder_worker.py. Cogs read these
+# instead of importing main (which runs as __main__ and must not be imported twice).
+import os
+import socket
+
+import discord
+import dotenv
+
+dotenv.load_dotenv()
+
+
+def parse_shard_ids(value: str):
+    """"0-3" or "0,2,5" -> [0, 1, 2, 3] / [0, 2, 5]; empty -> None."""
+    ids = []
+    for part in filter(None, (p.strip() for p in value.split(","))):
+        start, _, end = part.partition("-")
+        ids.extend(range(int(start), int(end or start) + 1))
+    return ids or None
+
+
+def cache_options(profile: str, max_messages: int = 0):
+    """Client kwargs for a gateway cache profile ("minimal" or "full")."""
+    if profile == "full":
+        return {"intents": discord.Intents.all(), "max_messages": max_messages or 1000}
+
+    # guilds: channel/guild cache for get_channel + interactions; voice_states: who /disconnect kicks.
+    # No members/presences/messages, interactions carry everything else the commands need.
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.voice_states = True
+    return {
+        "intents": intents,
+        "member_cache_flags": discord.MemberCacheFlags.from_intents(intents), # only members sitting in voice
+        "max_messages": max_messages or None, # None disables the message cache
+        "chunk_guilds_at_startup": False,
+    }
+
+
+CHANNEL_ID = int(os.getenv("CHANNEL_ID", "0"))  # legacy single-guild setup, claimed into guild_config at startup
+TOKEN = os.getenv("TOKEN")
+SHARDED = os.getenv("SHARDED", "0") == "1"  # run as AutoShardedBot
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0")) or None  # total shards across all processes
+SHARD_IDS = parse_shard_ids(os.getenv("SHARD_IDS", ""))  # shards owned by this process, e.g. "0-3"
+OWNS_ALL_SHARDS = SHARD_IDS is None  # False when other processes serve the remaining guilds
+FORCE_SYNC = os.getenv("FORCE_SYNC", "0") == "1"  # sync slash commands even if the tree hash is unchanged
+REMINDER_DISPATCH = os.getenv("REMINDER_DISPATCH", "1") == "1"  # 0 when reminder_worker.py processes deliver instead
+# seconds between polls for reminders other processes added or gave up: set it when several bots/workers share data.db,
+# 0 = never, unset = only reminder_worker.py and shard ranges poll (a lone bot schedules every row it adds itself)
+REMINDER_POLL = int(os.getenv("REMINDER_POLL")) if os.getenv("REMINDER_POLL") else None
+WORKER_ID = os.getenv("WORKER_ID") or f"{socket.gethostname()}:{os.getpid()}"  # lease owner name in the reminders table
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))  # 0 disables the local /metrics endpoint, one port per process on a host
+CACHE_PROFILE = os.getenv("CACHE_PROFILE", "minimal")  # "full" = Intents.all() and discord.py's default caches
+MESSAGE_CACHE = int(os.getenv("MESSAGE_CACHE", "0"))  # max cached messages, 0 = off (minimal) / 1000 (full)
+MAINTENANCE = os.getenv("MAINTENANCE", "1") == "1"  # DB backups/pruning/vacuum; one process per data.db is enough
+BACKUP_DIR = os.getenv("BACKUP_DIR", "backups")  # empty disables the online backups
+BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "7"))  # newest backup files kept
+DELIVERY_LOG_DAYS = int(os.getenv("DELIVERY_LOG_DAYS", "30"))  # reminder_deliveries retention
+DELIVERY_LOG_MAX_ROWS = int(os.getenv("DELIVERY_LOG_MAX_ROWS", "100000"))  # hard cap on reminder_deliveries
@@ -1,128 +1,781 @@
 # database.py
 import aiosqlite
+import asyncio
+import contextlib
 import datetime
+import sqlite3
+import time
+
+from logs import get_logger
+from migrations import run_migrations
+from metrics import timed, DB_CALL, DB_CACHE
+
+log = get_logger("db")
 
 DB_PATH = "data.db"
+READ_POOL_SIZE = 3  # readers; all writes go through one dedicated connection
+
+# column order of every reminder row handed out by this module
+REMINDER_COLUMNS = "id, user_id, reason, remind_at, channel_id, recurring_interval, recurrence, catch_up"
+
+# applied to every pooled connection when it is opened
+PRAGMAS = (
+    "PRAGMA auto_vacuum=INCREMENTAL",  # only takes on a fresh file, and only before WAL is switched on
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",  # safe with WAL, skips the fsync per commit
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",  # ~8 MB page cache per connection
+    "PRAGMA busy_timeout=5000",
+)
+
+
+# -----------------------------
+# CONNECTION POOL
+# -----------------------------
+async def _pragma_value(db, pragma: str):
+    async with db.execute(f"PRAGMA {pragma}") as cur:
+        row = await cur.fetchone()
+        return row[0] if row else None
+
+async def _enable_incremental_vacuum(db):
+    """One full VACUUM for files created before auto_vacuum was in PRAGMAS.
+
+    SQLite can only switch auto_vacuum outside WAL mode, which needs the file to
+    itself: if another process has it open this is skipped until the next start.
+    """
+    if await _pragma_value(db, "auto_vacuum") == 2:
+        return
+    try:
+        if await _pragma_value(db, "journal_mode=DELETE") != "delete":
+            return
+        try:
+            started = time.perf_counter()
+            await db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            await db.execute("VACUUM")
+            log.info("🗄️ Converted %s to incremental auto_vacuum", DB_PATH, extra={
+                "latency": round(time.perf_counter() - started, 3)
+            })
+        finally:
+            await _pragma_value(db, "journal_mode=WAL")
+    except sqlite3.OperationalError as e:
+        log.warning("⚠️ Could not enable incremental vacuum: %s", e)
+
+
+class ConnectionPool:
+    """Long-lived aiosqlite connections shared by all helpers.
+
+    WAL lets the readers run next to the writer, so reads are handed out from a
+    small queue while writes are serialized on a single connection and committed
+    (or rolled back) when the ``write()`` block exits. sqlite3 keeps a per
+    connection statement cache, so the constant SQL strings below are only
+    prepared once per connection.
+    """
+
+    def __init__(self, path: str, size: int = READ_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._writer = None
+        self._write_lock = asyncio.Lock()
+        self._readers = None
+        self._all = []
+
+    async def _connect(self):
+        db = await aiosqlite.connect(self.path, cached_statements=256)
+        for pragma in PRAGMAS:
+            async with db.execute(pragma):
+                pass
+        self._all.append(db)
+        return db
+
+    async def open(self):
+        self._writer = await self._connect()
+        await _enable_incremental_vacuum(self._writer) # before the readers attach
+        self._readers = asyncio.Queue()
+        for _ in range(self.size):
+            self._readers.put_nowait(await self._connect())
+
+    @contextlib.asynccontextmanager
+    async def read(self):
+        db = await self._readers.get()
+        try:
+            yield db
+        finally:
+            self._readers.put_nowait(db)
+
+    @contextlib.asynccontextmanager
+    async def write(self):
+        async with self._write_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+            else:
+                await self._writer.commit()
+
+    async def close(self):
+        for db in self._all:
+            await db.close()
+        self._all.clear()
+
+
+_pool = None
+_pool_lock = asyncio.Lock()
+
+
+async def get_pool() -> ConnectionPool:
+    """Return the shared pool opened by init_db()."""
+    if _pool is None:
+        # no lazy reopen: a pool opened after close_db() is never closed and its threads block interpreter exit
+        raise RuntimeError("database is not open, call init_db() first (or it was already closed)")
+    return _pool
+
+
+async def _open_pool():
+    global _pool
+    async with _pool_lock:
+        if _pool is None:
+            pool = ConnectionPool(DB_PATH)
+            await pool.open()
+            _pool = pool
+    return _pool
+
+
+async def close_db():
+    """Close all pooled connections (called on bot shutdown); init_db() opens them again."""
+    global _pool
+    games_cache.invalidate()
+    messages_cache.invalidate()
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.close()
+
+
+# -----------------------------
+# READ-THROUGH CACHE
+# -----------------------------
+class GuildTableCache:
+    """In-memory copy of one per-guild table, loaded a whole guild at a time on first read.
+
+    Writers patch the cached guild after their transaction committed. Every write
+    bumps the guild's version, so a read that was already loading when the write
+    happened doesn't store what it read. Only valid while this process is the
+    only writer of those rows (true for games/game_resets: a guild lives on one shard).
+    """
+
+    def __init__(self, table: str):
+        self.table = table
+        self._data = {}  # guild_id -> {key: value}
+        self._versions = {}  # guild_id -> writes seen
+        self._epoch = 0  # bumped by invalidate()
+
+    def _version(self, guild_id):
+        return self._epoch, self._versions.get(guild_id, 0)
+
+    async def get(self, guild_id: int, loader):
+        data = self._data.get(guild_id)
+        if data is not None:
+            DB_CACHE.inc(self.table, "hit")
+            return data
+        DB_CACHE.inc(self.table, "miss")
+        version = self._version(guild_id)
+        data = await loader(guild_id)
+        if self._version(guild_id) == version:
+            self._data[guild_id] = data
+        return data
+
+    def update(self, guild_id: int, change):
+        """Apply ``change(rows)`` to the cached guild (if loaded) after a committed write."""
+        self._versions[guild_id] = self._versions.get(guild_id, 0) + 1
+        data = self._data.get(guild_id)
+        if data is not None:
+            change(data)
+
+    def invalidate(self, guild_id: int = None):
+        if guild_id is None:
+            self._epoch += 1
+            self._data.clear()
+        else:
+            self._versions[guild_id] = self._versions.get(guild_id, 0) + 1
+            self._data.pop(guild_id, None)
+
+
+games_cache = GuildTableCache("games")  # guild_id -> {name: {"reset_hour", "tz", "icon"}}
+messages_cache = GuildTableCache("game_resets")  # guild_id -> {game_name: (message_id, embed_hash)}
 
 
 async def init_db():
-    """Initialize database and create tables if they don't exist."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        # game reset table 1
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS games (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE,
-                reset_hour INTEGER,
-                tz TEXT,
-                icon TEXT
-            )
-        """)
+    """Open the connection pool and bring the schema up to date (the only place the pool gets opened)."""
+    pool = await _open_pool()
+    async with pool.write() as db:
+        await run_migrations(db)
 
-        # game reset table 2
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS game_resets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                game_name TEXT UNIQUE,
-                message_id INTEGER,
-                FOREIGN KEY(game_name) REFERENCES games(name)
-            )
-        """)
+# -----------------------------
+# GUILD CONFIG FUNCTIONS
+# -----------------------------
+LEGACY_GUILD_ID = 0  # games/game_resets rows from before per-guild config
 
-        # reminder DB table (to store reminders of users and recurring ones)
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS reminders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT,
-                reason TEXT,
-                remind_at DATETIME,
-                channel_id TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                recurring_interval INTEGER DEFAULT NULL
-            )
-        """)
-        await db.commit()
+@timed(DB_CALL)
+async def get_guild_config(guild_id: int):
+    """Return {"reset_channel_id", "disconnect_tz", "dashboard"} for a guild, or None if it was never configured."""
+    pool = await get_pool()
+    async with pool.read() as db:
+        async with db.execute(
+            "SELECT reset_channel_id, disconnect_tz, dashboard FROM guild_config WHERE guild_id = ?", (guild_id,)
+        ) as cur:
+            row = await cur.fetchone()
+            return {"reset_channel_id": row[0], "disconnect_tz": row[1], "dashboard": bool(row[2])} if row else None
+
+@timed(DB_CALL)
+async def get_all_guild_configs():
+    pool = await get_pool()
+    async with pool.read() as db:
+        async with db.execute("SELECT guild_id, reset_channel_id, disconnect_tz, dashboard FROM guild_config") as cursor:
+            rows = await cursor.fetchall()
+            return {
+                row[0]: {"reset_channel_id": row[1], "disconnect_tz": row[2], "dashboard": bool(row[3])}
+                for row in rows
+            }
+
+@timed(DB_CALL)
+async def set_guild_config(guild_id: int, reset_channel_id: int = None, disconnect_tz: str = None, dashboard: bool = None):
+    """Create or update a guild's config; arguments left as None keep their current value."""
+    pool = await get_pool()
+    async with pool.write() as db:
+        await db.execute("INSERT OR IGNORE INTO guild_config (guild_id) VALUES (?)", (guild_id,))
+        if reset_channel_id is not None:
+            await db.execute("UPDATE guild_config SET reset_channel_id = ? WHERE guild_id = ?", (reset_channel_id, guild_id))
+        if disconnect_tz is not None:
+            await db.execute("UPDATE guild_config SET disconnect_tz = ? WHERE guild_id = ?", (disconnect_tz, guild_id))
+        if dashboard is not None:
+            await db.execute("UPDATE guild_config SET dashboard = ? WHERE guild_id = ?", (int(dashboard), guild_id))
+
+@timed(DB_CALL)
+async def claim_legacy_games(guild_id: int, reset_channel_id: int):
+    """Hand the unassigned pre-multi-guild games and message ids to ``guild_id``.
+
+    Used once for the guild of the old CHANNEL_ID setting. Returns the number of games moved.
+    """
+    pool = await get_pool()
+    async with pool.write() as db:
+        await db.execute(
+            "INSERT OR IGNORE INTO guild_config (guild_id, reset_channel_id) VALUES (?, ?)",
+            (guild_id, reset_channel_id)
+        )
+        async with db.execute(
+            "UPDATE OR IGNORE games SET guild_id = ? WHERE guild_id = ?", (guild_id, LEGACY_GUILD_ID)
+        ) as cursor:
+            moved = cursor.rowcount
+        await db.execute(
+            "UPDATE OR IGNORE game_resets SET guild_id = ? WHERE guild_id = ?", (guild_id, LEGACY_GUILD_ID)
+        )
+    for cache in (games_cache, messages_cache):
+        cache.invalidate(LEGACY_GUILD_ID)
+        cache.invalidate(guild_id)
+    return moved
 
 # -----------------------------
 # GAME TABLE FUNCTIONS
 # -----------------------------
-async def get_all_games():
-    async with aiosqlite.connect(DB_PATH) as db:
-        async with db.execute("SELECT name, reset_hour, tz, icon FROM games") as cursor:
+async def _load_games(guild_id: int):
+    pool = await get_pool()
+    async with pool.read() as db:
+        async with db.execute("SELECT name, reset_hour, tz, icon FROM games WHERE guild_id = ?", (guild_id,)) as cursor:
             rows = await cursor.fetchall()
             return {row[0]: {"reset_hour": row[1], "tz": row[2], "icon": row[3]} for row in rows}
 
-async def add_game(name: str, reset_hour: int, tz: str, icon: str = None):
-    async with aiosqlite.connect(DB_PATH) as db:
+@timed(DB_CALL)
+async def get_all_games(guild_id: int):
+    return dict(await games_cache.get(guild_id, _load_games))
+
+@timed(DB_CALL)
+async def add_game(guild_id: int, name: str, reset_hour: int, tz: str, icon: str = None):
+    pool = await get_pool()
+    async with pool.write() as db:
         await db.execute(
-            "INSERT OR IGNORE INTO games (name, reset_hour, tz, icon) VALUES (?, ?, ?, ?)",
-            (name, reset_hour, tz, icon or "")
+            "INSERT OR IGNORE INTO games (guild_id, name, reset_hour, tz, icon) VALUES (?, ?, ?, ?, ?)",
+            (guild_id, name, reset_hour, tz, icon or "")
         )
-        await db.commit()
+    # OR IGNORE: an existing game keeps its settings, same in the cache
+    games_cache.update(guild_id, lambda games: games.setdefault(name, {"reset_hour": reset_hour, "tz": tz, "icon": icon or ""}))
 
-async def remove_game(name: str):
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute("DELETE FROM games WHERE name = ?", (name,))
-        await db.execute("DELETE FROM game_resets WHERE game_name = ?", (name,))
-        await db.commit()
+@timed(DB_CALL)
+async def remove_game(guild_id: int, name: str):
+    pool = await get_pool()
+    async with pool.write() as db:
+        await db.execute("DELETE FROM games WHERE guild_id = ? AND name = ?", (guild_id, name))
+        await db.execute("DELETE FROM game_resets WHERE guild_id = ? AND game_name = ?", (guild_id, name))
+    games_cache.update(guild_id, lambda games: games.pop(name, None))
+    messages_cache.update(guild_id, lambda messages: messages.pop(name, None))
 
 # -----------------------------
 # GAME_RESETS TABLE FUNCTIONS
 # -----------------------------
-async def get_message_id(game_name: str):
-    async with aiosqlite.connect(DB_PATH) as db:
-        async with db.execute("SELECT message_id FROM game_resets WHERE game_name = ?", (game_name,)) as cur:
-            row = await cur.fetchone()
-            return row[0] if row else None
+async def _load_messages(guild_id: int):
+    # one query for the whole guild instead of one per game
+    pool = await get_pool()
+    async with pool.read() as db:
+        async with db.execute(
+            "SELECT game_name, message_id, embed_hash FROM game_resets WHERE guild_id = ?", (guild_id,)
+        ) as cur:
+            return {row[0]: (row[1], row[2]) for row in await cur.fetchall()}
 
-async def save_message_id(game_name: str, message_id: int):
-    async with aiosqlite.connect(DB_PATH) as db:
+async def get_message_id(guild_id: int, game_name: str):
+    # not timed itself, get_message_state already records the call
+    return (await get_message_state(guild_id, game_name))[0]
+
+@timed(DB_CALL)
+async def get_message_state(guild_id: int, game_name: str):
+    """Return (message_id, embed_hash) for a game, or (None, None)."""
+    messages = await messages_cache.get(guild_id, _load_messages)
+    return messages.get(game_name, (None, None))
+
+@timed(DB_CALL)
+async def save_message_id(guild_id: int, game_name: str, message_id: int, embed_hash: str = None):
+    pool = await get_pool()
+    async with pool.write() as db:
         await db.execute("""
-            INSERT INTO game_resets (game_name, message_id)
-            VALUES (?, ?)
-            ON CONFLICT(game_name)
-            DO UPDATE SET message_id = excluded.message_id
-        """, (game_name, message_id))
-        await db.commit()
+            INSERT INTO game_resets (guild_id, game_name, message_id, embed_hash)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(guild_id, game_name)
+            DO UPDATE SET message_id = excluded.message_id, embed_hash = excluded.embed_hash
+        """, (guild_id, game_name, message_id, embed_hash))
+    messages_cache.update(guild_id, lambda messages: messages.__setitem__(game_name, (message_id, embed_hash)))
+
+@timed(DB_CALL)
+async def take_game_messages(guild_id: int):
+    """Forget all per-game reset messages of a guild and return their ids (oldest first)."""
+    pool = await get_pool()
+    async with pool.write() as db:
+        async with db.execute(
+            "SELECT message_id FROM game_resets WHERE guild_id = ? AND message_id IS NOT NULL ORDER BY id", (guild_id,)
+        ) as cur:
+            ids = [row[0] for row in await cur.fetchall()]
+        await db.execute("DELETE FROM game_resets WHERE guild_id = ?", (guild_id,))
+    messages_cache.update(guild_id, lambda messages: messages.clear())
+    return ids
+
+# dashboard mode: all games of a guild rendered into as few messages as possible
+@timed(DB_CALL)
+async def get_dashboard_messages(guild_id: int):
+    """Return {page: (message_id, embed_hash)}."""
+    pool = await get_pool()
+    async with pool.read() as db:
+        async with db.execute(
+            "SELECT page, message_id, embed_hash FROM dashboard_messages WHERE guild_id = ?", (guild_id,)
+        ) as cur:
+            return {row[0]: (row[1], row[2]) for row in await cur.fetchall()}
+
+@timed(DB_CALL)
+async def save_dashboard_message(guild_id: int, page: int, message_id: int, embed_hash: str = None):
+    pool = await get_pool()
+    async with pool.write() as db:
+        await db.execute("""
+            INSERT INTO dashboard_messages (guild_id, page, message_id, embed_hash)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(guild_id, page)
+            DO UPDATE SET message_id = excluded.message_id, embed_hash = excluded.embed_hash
+        """, (guild_id, page, message_id, embed_hash))
+
+@timed(DB_CALL)
+async def delete_dashboard_messages(guild_id: int, from_page: int = 0):
+    """Forget dashboard pages >= from_page and return their message ids (first page first)."""
+    pool = await get_pool()
+    async with pool.write() as db:
+        async with db.execute(
+            "SELECT message_id FROM dashboard_messages WHERE guild_id = ? AND page >= ? ORDER BY page",
+            (guild_id, from_page)
+        ) as cur:
+            ids = [row[0] for row in await cur.fetchall()]
+        await db.execute("DELETE FROM dashboard_messages WHERE guild_id = ? AND page >= ?", (guild_id, from_page))
+        return ids
 
 # reminder DB stuff
-async def add_reminder(user_id: str, reason: str, remind_at: datetime.datetime, channel_id: str, recurring_interval: int = None):
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            "INSERT INTO reminders (user_id, reason, remind_at, channel_id, recurring_interval) VALUES (?, ?, ?, ?, ?)",
-            (user_id, reason, remind_at.isoformat(), channel_id, recurring_interval)
-        )
-        await db.commit()
+@timed(DB_CALL)
+async def add_reminder(user_id: str, reason: str, remind_at: datetime.datetime, channel_id: str,
+                       recurring_interval: int = None, recurrence: str = None, catch_up: str = "one"):
+    pool = await get_pool()
+    async with pool.write() as db:
+        async with db.execute(
+            "INSERT INTO reminders (user_id, reason, remind_at, channel_id, recurring_interval, recurrence, catch_up) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (user_id, reason, int(remind_at.timestamp()), channel_id, recurring_interval, recurrence, catch_up)
+        ) as cursor:
+            return cursor.lastrowid  # new reminder id, used to schedule it in-process
 
-async def get_due_reminders():
-    now = datetime.datetime.utcnow().isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
+@timed(DB_CALL)
+async def get_due_reminders(now: int = None):
+    if now is None:
+        now = int(time.time())
+    pool = await get_pool()
+    async with pool.read() as db:
         async with db.execute(
-            "SELECT id, user_id, reason, remind_at, channel_id, recurring_interval "
-            "FROM reminders WHERE remind_at <= ?",
+            f"SELECT {REMINDER_COLUMNS} FROM reminders WHERE remind_at <= ?",
             (now,)
         ) as cursor:
             rows = await cursor.fetchall()
             return rows
 
+@timed(DB_CALL)
 async def delete_reminder(reminder_id: int):
-    async with aiosqlite.connect(DB_PATH) as db:
+    pool = await get_pool()
+    async with pool.write() as db:
         await db.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
-        await db.commit()
 
+@timed(DB_CALL)
 async def update_reminder_time(reminder_id: int, new_time: datetime.datetime):
-    async with aiosqlite.connect(DB_PATH) as db:
+    pool = await get_pool()
+    async with pool.write() as db:
         await db.execute(
             "UPDATE reminders SET remind_at = ? WHERE id = ?",
-            (new_time.isoformat(), reminder_id)
+            (int(new_time.timestamp()), reminder_id)
+        )
+
+@timed(DB_CALL)
+async def claim_due_reminders(worker_id: str, now: int = None, lease_seconds: int = 120, limit: int = 500,
+                              exclude_channels=()):
+    """Lease up to ``limit`` due reminders to ``worker_id`` and return them.
+
+    Rows leased by someone else are skipped until their lease expires, which is
+    also how the batch of a crashed worker gets picked up again.
+    """
+    if now is None:
+        now = int(time.time())
+    exclude_channels = tuple(exclude_channels)
+    exclude = f"AND channel_id NOT IN ({', '.join('?' * len(exclude_channels))})" if exclude_channels else ""
+    pool = await get_pool()
+    async with pool.write() as db:
+        if not db.in_transaction:
+            # grab the write lock before reading so two processes can't select the same rows
+            await db.execute("BEGIN IMMEDIATE")
+        async with db.execute(
+            f"SELECT {REMINDER_COLUMNS} FROM reminders "
+            f"WHERE remind_at <= ? AND (lease_expires IS NULL OR lease_expires <= ?) {exclude} "
+            f"ORDER BY remind_at LIMIT ?",
+            (now, now, *exclude_channels, limit)
+        ) as cursor:
+            rows = await cursor.fetchall()
+        if rows:
+            await db.executemany(
+                "UPDATE reminders SET lease_owner = ?, lease_expires = ? WHERE id = ?",
+                [(worker_id, now + lease_seconds, row[0]) for row in rows]
+            )
+        return rows
+
+@timed(DB_CALL)
+async def next_reminder_lease_expiry(now: int = None, exclude_channels=()):
+    """When the earliest due reminder that is leased by someone else (or backing off after a failed send) frees up."""
+    if now is None:
+        now = int(time.time())
+    exclude_channels = tuple(exclude_channels)
+    exclude = f"AND channel_id NOT IN ({', '.join('?' * len(exclude_channels))})" if exclude_channels else ""
+    pool = await get_pool()
+    async with pool.read() as db:
+        async with db.execute(
+            f"SELECT MIN(lease_expires) FROM reminders WHERE remind_at <= ? AND lease_expires > ? {exclude}",
+            (now, now, *exclude_channels)
+        ) as cursor:
+            row = await cursor.fetchone()
+            return row[0] if row else None
+
+@timed(DB_CALL)
+async def renew_reminder_leases(worker_id: str, reminder_ids, lease_expires: int):
+    pool = await get_pool()
+    async with pool.write() as db:
+        await db.executemany(
+            "UPDATE reminders SET lease_expires = ? WHERE id = ? AND lease_owner = ?",
+            [(lease_expires, rid, worker_id) for rid in reminder_ids]
+        )
+
+@timed(DB_CALL)
+async def release_reminder_leases(worker_id: str, reminder_ids, retry_at: int = None):
+    """Give leased rows back; with ``retry_at`` nobody can claim them before that time."""
+    pool = await get_pool()
+    async with pool.write() as db:
+        await db.executemany(
+            "UPDATE reminders SET lease_owner = NULL, lease_expires = ? WHERE id = ? AND lease_owner = ?",
+            [(retry_at, rid, worker_id) for rid in reminder_ids]
         )
-        await db.commit()
+
+@timed(DB_CALL)
+async def apply_reminder_results(deleted_ids, rescheduled, worker_id: str = None, deliveries=()):
+    """Delete delivered one-off reminders and move recurring ones in one transaction.
+
+    ``rescheduled`` is a list of (reminder_id, new remind_at epoch). Only rows
+    still leased by ``worker_id`` are touched, a lease that expired mid-send
+    belongs to whoever claimed the row next. ``deliveries`` is a list of
+    (reminder_id, status) written to reminder_deliveries in the same transaction.
+    """
+    if not deleted_ids and not rescheduled:
+        return
+    pool = await get_pool()
+    async with pool.write() as db:
+        if deliveries:
+            # copied from the row before it is deleted/moved, so remind_at is the time that was due
+            now = int(time.time())
+            await db.executemany(
+                "INSERT INTO reminder_deliveries (reminder_id, user_id, channel_id, remind_at, delivered_at, status, worker_id) "
+                "SELECT id, user_id, channel_id, remind_at, ?, ?, ? FROM reminders WHERE id = ? AND lease_owner IS ?",
+                [(now, status, worker_id, rid, worker_id) for rid, status in deliveries]
+            )
+        if deleted_ids:
+            await db.executemany(
+                "DELETE FROM reminders WHERE id = ? AND lease_owner IS ?", [(rid, worker_id) for rid in deleted_ids]
+            )
+        if rescheduled:
+            await db.executemany(
+                "UPDATE reminders SET remind_at = ?, lease_owner = NULL, lease_expires = NULL "
+                "WHERE id = ? AND lease_owner IS ?",
+                [(int(remind_at), rid, worker_id) for rid, remind_at in rescheduled]
+            )
+
+@timed(DB_CALL)
+async def get_reminders_page(user_id: str = None, channel_id: str = None, after: tuple = None, limit: int = 10):
+    """One page of reminders ordered by (remind_at, id), optionally filtered by user and/or channel.
+
+    ``after`` is the (remind_at, id) of the last row of the previous page, so
+    every page is an index range scan no matter how many rows other users have.
+    """
+    where, params = [], []
+    if user_id is not None:
+        where.append("user_id = ?")
+        params.append(str(user_id))
+    if channel_id is not None:
+        where.append("channel_id = ?")
+        params.append(str(channel_id))
+    if after is not None:
+        where.append("(remind_at, id) > (?, ?)")
+        params.extend(after)
+    sql = f"SELECT {REMINDER_COLUMNS} FROM reminders"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY remind_at, id LIMIT ?"
+    params.append(limit)
+
+    pool = await get_pool()
+    async with pool.read() as db:
+        async with db.execute(sql, params) as cursor:
+            return await cursor.fetchall()
+
+@timed(DB_CALL)
+async def delete_user_reminder(reminder_id: int, user_id: str):
+    """Delete a reminder only if it belongs to ``user_id``. Returns True if a row was deleted."""
+    pool = await get_pool()
+    async with pool.write() as db:
+        async with db.execute(
+            "DELETE FROM reminders WHERE id = ? AND user_id = ?", (reminder_id, str(user_id))
+        ) as cursor:
+            return cursor.rowcount > 0
 
 # fetch all reminders
+@timed(DB_CALL)
 async def get_all_reminders():
-    async with aiosqlite.connect(DB_PATH) as db:
+    pool = await get_pool()
+    async with pool.read() as db:
         async with db.execute(
-            "SELECT id, user_id, reason, remind_at, channel_id, recurring_interval FROM reminders ORDER BY remind_at ASC"
+            f"SELECT {REMINDER_COLUMNS} FROM reminders ORDER BY remind_at ASC"
         ) as cursor:
             rows = await cursor.fetchall()
-            return rows
\ No newline at end of file
+            return rows
+
+# -----------------------------
+# SCRAPER CACHE FUNCTIONS
+# -----------------------------
+@timed(DB_CALL)
+async def get_scraper_cache(key: str):
+    """Return (etag, last_modified, payload, fetched_at) or None."""
+    pool = await get_pool()
+    async with pool.read() as db:
+        async with db.execute(
+            "SELECT etag, last_modified, payload, fetched_at FROM scraper_cache WHERE key = ?", (key,)
+        ) as cur:
+            return await cur.fetchone()
+
+@timed(DB_CALL)
+async def save_scraper_cache(key: str, etag: str, last_modified: str, payload: str, fetched_at: int):
+    pool = await get_pool()
+    async with pool.write() as db:
+        await db.execute("""
+            INSERT INTO scraper_cache (key, etag, last_modified, payload, fetched_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                payload = excluded.payload,
+                fetched_at = excluded.fetched_at
+        """, (key, etag, last_modified, payload, fetched_at))
+
+# -----------------------------
+# BOT STATE FUNCTIONS
+# -----------------------------
+@timed(DB_CALL)
+async def get_bot_state(key: str):
+    pool = await get_pool()
+    async with pool.read() as db:
+        async with db.execute("SELECT value FROM bot_state WHERE key = ?", (key,)) as cur:
+            row = await cur.fetchone()
+            return row[0] if row else None
+
+@timed(DB_CALL)
+async def set_bot_state(key: str, value: str):
+    pool = await get_pool()
+    async with pool.write() as db:
+        await db.execute(
+            "INSERT INTO bot_state (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+# -----------------------------
+# DISCONNECT JOB FUNCTIONS
+# -----------------------------
+# rows: (id, guild_id, run_at, channel_id, member_id)
+@timed(DB_CALL)
+async def add_disconnect_job(guild_id: int, run_at: int, channel_id: int = None, member_id: int = None, created_by: int = None):
+    """Store a disconnect job, replacing any pending job with the same target.
+
+    Returns (new job id, ids of the replaced jobs).
+    """
+    pool = await get_pool()
+    async with pool.write() as db:
+        async with db.execute(
+            "SELECT id FROM disconnect_jobs WHERE guild_id = ? AND channel_id IS ? AND member_id IS ?",
+            (guild_id, channel_id, member_id)
+        ) as cursor:
+            replaced = [row[0] for row in await cursor.fetchall()]
+        if replaced:
+            await db.executemany("DELETE FROM disconnect_jobs WHERE id = ?", [(job_id,) for job_id in replaced])
+        async with db.execute(
+            "INSERT INTO disconnect_jobs (guild_id, run_at, channel_id, member_id, created_by) VALUES (?, ?, ?, ?, ?)",
+            (guild_id, run_at, channel_id, member_id, created_by)
+        ) as cursor:
+            return cursor.lastrowid, replaced
+
+@timed(DB_CALL)
+async def get_disconnect_jobs(guild_id: int = None):
+    sql = "SELECT id, guild_id, run_at, channel_id, member_id FROM disconnect_jobs"
+    params = ()
+    if guild_id is not None:
+        sql += " WHERE guild_id = ?"
+        params = (guild_id,)
+    pool = await get_pool()
+    async with pool.read() as db:
+        async with db.execute(sql + " ORDER BY run_at", params) as cursor:
+            return await cursor.fetchall()
+
+@timed(DB_CALL)
+async def delete_disconnect_job(job_id: int):
+    pool = await get_pool()
+    async with pool.write() as db:
+        await db.execute("DELETE FROM disconnect_jobs WHERE id = ?", (job_id,))
+
+@timed(DB_CALL)
+async def delete_guild_disconnect_jobs(guild_id: int):
+    """Delete all pending jobs of a guild and return their ids."""
+    pool = await get_pool()
+    async with pool.write() as db:
+        async with db.execute("SELECT id FROM disconnect_jobs WHERE guild_id = ?", (guild_id,)) as cursor:
+            job_ids = [row[0] for row in await cursor.fetchall()]
+        await db.execute("DELETE FROM disconnect_jobs WHERE guild_id = ?", (guild_id,))
+        return job_ids
+
+
+# -----------------------------
+# MAINTENANCE
+# -----------------------------
+BACKUP_PAGES = 256  # pages copied per backup step (~1 MB at the default 4 KB page size)
+BACKUP_PAUSE = 0.01  # seconds between steps, in aiosqlite's thread (the event loop keeps running)
+PRUNE_BATCH = 5000  # delivery log rows deleted per write transaction
+VACUUM_BATCH = 500  # free pages released per write transaction
+ANALYZE_LIMIT = 1000  # rows sampled per index by ANALYZE
+
+@timed(DB_CALL)
+async def backup_db(target_path: str, pages: int = BACKUP_PAGES, pause: float = BACKUP_PAUSE):
+    """Copy the live database to ``target_path`` with SQLite's online backup API.
+
+    Runs on its own connection inside one read transaction: under WAL that pins
+    a consistent snapshot, writers keep committing next to it, and the copy
+    doesn't restart from page 0 every time one of them does. The copy is
+    switched to a rollback journal (one self-contained file) and quick_checked.
+    """
+    source = await aiosqlite.connect(DB_PATH, isolation_level=None)
+    target = await aiosqlite.connect(target_path, isolation_level=None)
+    try:
+        await source.execute("PRAGMA busy_timeout=5000")
+        await source.execute("BEGIN")
+        async with source.execute("SELECT COUNT(*) FROM sqlite_master"):
+            pass # the first read starts the snapshot
+        await source.backup(
+            target,
+            pages=pages,
+            progress=lambda status, remaining, total: time.sleep(pause) if remaining else None
+        )
+        await source.execute("COMMIT")
+
+        await target.execute("PRAGMA journal_mode=DELETE")
+        async with target.execute("PRAGMA quick_check") as cur:
+            (result,) = await cur.fetchone()
+    finally:
+        await source.close()
+        await target.close()
+    if result != "ok":
+        raise sqlite3.DatabaseError(f"backup {target_path} failed quick_check: {result}")
+
+@timed(DB_CALL)
+async def prune_reminder_deliveries(before: int, keep_rows: int, batch: int = PRUNE_BATCH):
+    """Drop delivery log rows older than ``before`` or beyond the newest ``keep_rows``; returns rows removed.
+
+    Deletes in batches, each its own short transaction, so reminder writes never wait long.
+    """
+    pool = await get_pool()
+    async with pool.read() as db:
+        async with db.execute(
+            "SELECT id FROM reminder_deliveries ORDER BY id DESC LIMIT 1 OFFSET ?", (keep_rows,)
+        ) as cur:
+            row = await cur.fetchone()
+    cap_id = row[0] if row else 0  # everything up to here is over the row cap
+
+    removed = 0
+    while True:
+        async with pool.write() as db:
+            cursor = await db.execute(
+                "DELETE FROM reminder_deliveries WHERE id IN ("
+                "SELECT id FROM reminder_deliveries WHERE delivered_at < ? OR id <= ? ORDER BY id LIMIT ?)",
+                (before, cap_id, batch)
+            )
+            count = cursor.rowcount
+        removed += count
+        if count < batch:
+            return removed
+
+@timed(DB_CALL)
+async def incremental_vacuum(max_pages: int = None, batch: int = VACUUM_BATCH):
+    """Hand free pages back to the filesystem a batch at a time; returns pages released."""
+    pool = await get_pool()
+    async with pool.read() as db:
+        if await _pragma_value(db, "auto_vacuum") != 2:
+            return 0 # not converted yet, see _enable_incremental_vacuum
+
+    released = 0
+    while max_pages is None or released < max_pages:
+        async with pool.read() as db:
+            free = await _pragma_value(db, "freelist_count")
+        if not free:
+            break
+        step = min(free, batch) if max_pages is None else min(free, batch, max_pages - released)
+        async with pool.write() as db:
+            # executescript steps the pragma to the end, execute() would stop after the first page
+            await db.executescript(f"PRAGMA incremental_vacuum({step});")
+        released += step
+    if released:
+        async with pool.write() as db:
+            async with db.execute("PRAGMA wal_checkpoint(PASSIVE)") as cur:
+                await cur.fetchall() # shrinks the main file once the WAL is copied back
+    return released
+
+@timed(DB_CALL)
+async def analyze_db(limit: int = ANALYZE_LIMIT):
+    """Refresh the planner statistics with a bounded ANALYZE."""
+    pool = await get_pool()
+    async with pool.write() as db:
+        await db.execute(f"PRAGMA analysis_limit={int(limit)}")
+        await db.execute("ANALYZE")
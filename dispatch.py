@@ -0,0 +1,308 @@
+# dispatch.py
+import asyncio
+import itertools
+import re
+import time
+
+import aiohttp
+import discord
+
+from metrics import RATE_LIMITED
+
+# lower number = sent first
+PRIORITY_REMINDER = 0
+PRIORITY_COMMAND = 1
+PRIORITY_REFRESH = 2
+
+# Discord allows roughly 5 message sends/edits per 5s per channel and 50 requests/s globally
+ROUTE_CAPACITY = 5
+ROUTE_PER = 5.0
+GLOBAL_CAPACITY = 50
+GLOBAL_PER = 1.0
+MAX_CONCURRENCY = 4
+MAX_RETRIES = 3
+# the send/edit routes the queue paces (one bucket per channel), matched on discord.py's request URLs
+QUEUED_ROUTE = re.compile(r"/channels/(\d+)/messages(?:/\d+)?$")
+
+
+def route_label(method: str, path: str):
+    """Metric label for a request path, e.g. "POST /channels/{id}/messages" (ids and webhook tokens masked)."""
+    path = re.sub(r"^/api/v\d+", "", path)
+    path = re.sub(r"/(webhooks|interactions)/\d+/[^/]+", r"/\1/{id}/{token}", path)
+    path = re.sub(r"/\d+", "/{id}", path)
+    return f"{method} {path}"
+
+
+class TokenBucket:
+    """Classic token bucket, corrected by Discord's rate-limit headers when we see them."""
+
+    def __init__(self, capacity: int, per: float, clock=time.monotonic):
+        self.capacity = capacity
+        self.per = per
+        self._clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.capacity / self.per)
+            self.updated = now
+
+    def ready_at(self, now: float = None) -> float:
+        """Earliest time a token is available."""
+        if now is None:
+            now = self._clock()
+        self._refill(now)
+        if self.tokens >= 1:
+            return max(now, self.blocked_until)
+        missing = 1 - self.tokens
+        return max(now + missing * self.per / self.capacity, self.blocked_until)
+
+    def take(self, now: float = None):
+        if now is None:
+            now = self._clock()
+        self._refill(now)
+        self.tokens -= 1
+
+    def block(self, seconds: float, now: float = None):
+        if now is None:
+            now = self._clock()
+        self.tokens = 0
+        self.updated = now
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+    def update_from_headers(self, headers, now: float = None):
+        """Apply X-RateLimit-Limit/Remaining/Reset-After from a Discord response."""
+        if now is None:
+            now = self._clock()
+        limit = headers.get("X-RateLimit-Limit")
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if limit is not None:
+            self.capacity = max(1, int(limit))
+        if remaining is not None:
+            self._refill(now)
+            # only ever lower: answers to requests sent before our latest take() would hand spent tokens back
+            self.tokens = min(self.tokens, float(remaining), self.capacity)
+            if int(remaining) == 0 and reset_after is not None:
+                self.blocked_until = max(self.blocked_until, now + float(reset_after))
+
+
+def _retry_after(headers):
+    value = headers.get("Retry-After") or headers.get("X-RateLimit-Reset-After")
+    return float(value) if value is not None else 1.0
+
+
+def retry_after_of(error: Exception):
+    """Seconds to back off if ``error`` is a rate limit, else None."""
+    if isinstance(error, discord.RateLimited):
+        return error.retry_after
+    if isinstance(error, discord.HTTPException) and error.status == 429:
+        return _retry_after(getattr(error.response, "headers", None) or {})
+    return None
+
+
+def rate_limit_trace(get_queue) -> aiohttp.TraceConfig:
+    """aiohttp trace for discord.py's HTTP session (``http_trace=``) that shows the queue every response.
+
+    discord.py sleeps through 429s and retries on its own, so they never reach the
+    queue as errors; this is where the buckets get Discord's headers from instead.
+    ``get_queue`` is called per response, the queue may be swapped after the client exists.
+    """
+    trace = aiohttp.TraceConfig()
+
+    async def on_request_end(session, context, params):
+        if params.response.status == 429:
+            # every 429 discord.py got, including the ones it slept through and retried
+            RATE_LIMITED.inc(route_label(params.method, params.url.path))
+        get_queue().observe(params.method, params.url.path, params.response.status, params.response.headers)
+
+    trace.on_request_end.append(on_request_end)
+    return trace
+
+
+class _Job:
+    __slots__ = ("priority", "seq", "route", "factory", "coalesce_key", "futures", "attempts")
+
+    def __init__(self, priority, seq, route, factory, coalesce_key):
+        self.priority = priority
+        self.seq = seq
+        self.route = route
+        self.factory = factory
+        self.coalesce_key = coalesce_key
+        self.futures = []
+        self.attempts = 0
+
+
+class OutboundQueue:
+    """Single async dispatch queue for outbound channel sends and edits.
+
+    ``submit(route, factory)`` queues ``factory()`` (a zero-arg callable
+    returning the API coroutine, so it can be retried) and resolves with its
+    result. Jobs go out in priority order as soon as their route bucket (one
+    per channel) and the global bucket have a token. Discord's rate-limit
+    headers reach the buckets through ``observe`` (see ``rate_limit_trace``);
+    a 429 that discord.py gives up on blocks the bucket for the advertised
+    retry-after and re-queues the job. Pending jobs that
+    share a ``coalesce_key`` (e.g. edits of one message) collapse into the
+    newest one.
+    """
+
+    def __init__(self, route_capacity: int = ROUTE_CAPACITY, route_per: float = ROUTE_PER,
+                 global_capacity: int = GLOBAL_CAPACITY, global_per: float = GLOBAL_PER,
+                 max_concurrency: int = MAX_CONCURRENCY, clock=time.monotonic):
+        self._route_capacity = route_capacity
+        self._route_per = route_per
+        self._clock = clock
+        self._global = TokenBucket(global_capacity, global_per, clock)
+        self._buckets = {}
+        self._pending = []
+        self._coalesce = {}
+        self._seq = itertools.count()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._inflight = set()  # running _execute tasks, the loop only keeps weak references
+        self.stats = {"sent": 0, "coalesced": 0, "rate_limited": 0, "failed": 0}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def bucket(self, route) -> TokenBucket:
+        bucket = self._buckets.get(route)
+        if bucket is None:
+            bucket = self._buckets[route] = TokenBucket(self._route_capacity, self._route_per, self._clock)
+        return bucket
+
+    def observe(self, method: str, path: str, status: int, headers):
+        """Apply the rate-limit headers of a response discord.py received (429s included)."""
+        match = QUEUED_ROUTE.search(path)
+        if match is None or method not in ("POST", "PATCH"):
+            return # deletes and everything else live in other Discord buckets
+        now = self._clock()
+        bucket = self.bucket(int(match.group(1)))
+        bucket.update_from_headers(headers, now)
+        if status == 429:
+            # discord.py retries this one itself, jobs behind it wait with us instead of piling onto its lock
+            bucket.block(_retry_after(headers), now)
+            if headers.get("X-RateLimit-Global"):
+                self._global.block(_retry_after(headers), now)
+
+    async def submit(self, route, factory, priority: int = PRIORITY_REFRESH, coalesce_key=None):
+        future = asyncio.get_running_loop().create_future()
+        job = self._coalesce.get(coalesce_key) if coalesce_key is not None else None
+        if job is not None:
+            # newer content wins, everyone waiting on the old edit gets the new result
+            job.factory = factory
+            job.priority = min(job.priority, priority)
+            self.stats["coalesced"] += 1
+        else:
+            job = _Job(priority, next(self._seq), route, factory, coalesce_key)
+            self._pending.append(job)
+            if coalesce_key is not None:
+                self._coalesce[coalesce_key] = job
+        job.futures.append(future)
+        self._wakeup.set()
+        return await future
+
+    # -----------------------------
+    # Dispatcher
+    # -----------------------------
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def close(self):
+        """Stop dispatching (shutdown): requests already sent finish, whoever still waits in the queue is cancelled."""
+        self.stop()
+        if self._inflight:
+            await asyncio.wait(list(self._inflight))
+        for job in self._pending:
+            for future in job.futures:
+                future.cancel()
+        self._pending.clear()
+        self._coalesce.clear()
+
+    def _next_ready(self):
+        now = self._clock()
+        global_at = self._global.ready_at(now)
+        soonest = None
+        for job in sorted(self._pending, key=lambda j: (j.priority, j.seq)):
+            ready_at = max(global_at, self.bucket(job.route).ready_at(now))
+            if ready_at <= now:
+                return job, None
+            soonest = ready_at if soonest is None else min(soonest, ready_at)
+        return None, (None if soonest is None else soonest - now)
+
+    async def _run(self):
+        while True:
+            await self._slots.acquire()
+            job = None
+            try:
+                while job is None:
+                    self._wakeup.clear()
+                    job, wait = self._next_ready()
+                    if job is None:
+                        try:
+                            await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                        except asyncio.TimeoutError:
+                            pass
+            except BaseException:
+                self._slots.release()
+                raise
+
+            self._pending.remove(job)
+            if job.coalesce_key is not None:
+                self._coalesce.pop(job.coalesce_key, None)
+            now = self._clock()
+            self._global.take(now)
+            self.bucket(job.route).take(now)
+            task = asyncio.create_task(self._execute(job))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _execute(self, job: _Job):
+        try:
+            job.attempts += 1
+            result = await job.factory()
+        except Exception as e:
+            retry_after = retry_after_of(e)
+            if retry_after is not None:
+                self.stats["rate_limited"] += 1 # RATE_LIMITED already counted it in rate_limit_trace
+                bucket = self.bucket(job.route)
+                headers = getattr(getattr(e, "response", None), "headers", None)
+                if headers:
+                    bucket.update_from_headers(headers)
+                bucket.block(retry_after)
+                if job.attempts < MAX_RETRIES:
+                    self._requeue(job)
+                    return
+            self.stats["failed"] += 1
+            for future in job.futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            self.stats["sent"] += 1
+            for future in job.futures:
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def _requeue(self, job: _Job):
+        pending = self._coalesce.get(job.coalesce_key) if job.coalesce_key is not None else None
+        if pending is not None:
+            # a newer edit for the same message is already queued, let it answer for this one too
+            pending.futures.extend(job.futures)
+        else:
+            self._pending.append(job)
+            if job.coalesce_key is not None:
+                self._coalesce[job.coalesce_key] = job
+        self._wakeup.set()
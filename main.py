@@ -1,446 +1,134 @@
-import discord
-from discord.ext import commands, tasks
-import datetime
-import asyncio
-import pytz
-import dotenv
-import os
-import re
-import requests
 import time
-from bs4 import BeautifulSoup
+BOOT_STARTED = time.perf_counter()  # time-to-ready includes imports
 
+import discord
+from discord.ext import commands
+import hashlib
+import json
+
+import config
+from config import TOKEN, SHARDED, SHARD_COUNT, SHARD_IDS, FORCE_SYNC, METRICS_PORT
+from scheduler import DueScheduler
+import metrics
+import logs
+from metrics import STARTUP
+from dispatch import OutboundQueue, rate_limit_trace
+from cogs import EXTENSIONS
 
 # import DB helpers
-from database import (
-    init_db,
-    get_all_games,
-    get_message_id,
-    save_message_id,
-    add_reminder,
-    get_due_reminders,
-    delete_reminder,
-    update_reminder_time,
-    get_all_reminders
+from database import init_db, close_db, get_bot_state, set_bot_state
+
+log = logs.get_logger("bot")
+
+
+async def _not_loaded(due):
+    log.warning("⚠️ %d timers fired before their extension was loaded", len(due))
+
+
+class BlushyBot(commands.AutoShardedBot if SHARDED or SHARD_IDS else commands.Bot):
+    """Holds everything that has to survive a `/reload`; the features live in cogs/."""
+
+    def __init__(self, **options):
+        # discord.py handles 429s internally, the trace passes every response's rate-limit headers to the queue
+        super().__init__(http_trace=rate_limit_trace(lambda: self.outbound), **options)
+        # every channel send/edit goes through this queue (rate limits + priorities)
+        self.outbound = OutboundQueue()
+        # the cogs point on_due at their (re)loaded handlers, pending timers stay put
+        self.reset_scheduler = DueScheduler(_not_loaded)
+        self.reminder_scheduler = DueScheduler(_not_loaded)
+        self.disconnect_scheduler = DueScheduler(_not_loaded)
+        self.maintenance_scheduler = DueScheduler(_not_loaded)
+        self.reminder_dispatch = config.REMINDER_DISPATCH
+        self.worker_id = config.WORKER_ID
+        self.rest_only = False  # set by reminder_worker.py: no gateway, channels are addressed by id only
+        self.foreign_channels = set()  # channels another shard process delivers to, never claimed here
+        self.metrics_server = None
+        self.ready_after = None  # seconds from process start to the first on_ready
+
+    async def setup_hook(self):
+        # once per process, before the gateway connects: DB, queues, metrics, cogs, slash commands
+        try:
+            await init_db()
+            self.outbound.start() # start outbound message queue
+            if self.rest_only:
+                # reminder_worker.py: delivery only, no metrics port or command sync next to the bot
+                await self.load_extension("cogs.reminders")
+                return
+            if METRICS_PORT and self.metrics_server is None:
+                try:
+                    self.metrics_server = await metrics.start_http_server(METRICS_PORT)
+                    log.info("📈 Metrics on http://%s:%s/metrics", metrics.METRICS_HOST, METRICS_PORT)
+                except OSError as e:
+                    # usually another shard process on this host already has the port, give each its own METRICS_PORT
+                    log.warning("⚠️ Metrics endpoint disabled, port %s: %s", METRICS_PORT, e, extra={"port": METRICS_PORT})
+            for name in EXTENSIONS:
+                try:
+                    await self.load_extension(name)
+                except commands.ExtensionError:
+                    log.exception("⚠️ Failed to load %s", name, extra={"extension": name}) # fix it and /reload
+            await self.sync_commands()
+        finally:
+            STARTUP.observe(time.perf_counter() - BOOT_STARTED, "setup_hook") # since process start, like "ready"
+
+    async def close(self):
+        # timers first: a handler that is still running gets to finish its sends and DB writes
+        for scheduler in (self.reset_scheduler, self.reminder_scheduler, self.disconnect_scheduler, self.maintenance_scheduler):
+            await scheduler.close()
+        await self.outbound.close()
+        await super().close() # HTTP session + gateway
+        if self.metrics_server is not None:
+            await self.metrics_server.cleanup()
+        await close_db() # flush + close pooled DB connections
+
+    def command_tree_hash(self):
+        payload = sorted((cmd.to_dict(self.tree) for cmd in self.tree.get_commands()), key=lambda cmd: cmd["name"])
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    async def sync_commands(self):
+        """Global sync is slow and rate limited, only do it when the command tree actually changed."""
+        key = f"command_tree_hash:{self.application_id}"
+        tree_hash = self.command_tree_hash()
+        if not FORCE_SYNC and await get_bot_state(key) == tree_hash:
+            log.info("🔗 Slash commands unchanged, skipping sync", extra={"tree_hash": tree_hash})
+            return
+        try:
+            synced = await self.tree.sync()
+        except Exception as e:
+            log.warning("⚠️ Failed to sync: %s", e, extra={"status": getattr(e, "status", None)})
+            return # hash not stored, next start tries again
+        await set_bot_state(key, tree_hash)
+        log.info("🔗 Synced %d slash commands", len(synced), extra={"tree_hash": tree_hash})
+
+
+bot_options = {}
+if SHARD_IDS:
+    bot_options.update(shard_ids=SHARD_IDS, shard_count=SHARD_COUNT)
+elif SHARDED and SHARD_COUNT:
+    bot_options["shard_count"] = SHARD_COUNT
+
+bot = BlushyBot(
+    command_prefix="!",
+    **config.cache_options(config.CACHE_PROFILE, config.MESSAGE_CACHE),
+    activity=discord.Game(name="🐈 with my Kitty Timers uwu"), # sent on every identify, survives reconnects
+    **bot_options
 )
 
-dotenv.load_dotenv()
-tz = pytz.timezone("Europe/Berlin")
-
-# reminder cache
-disconnect_tasks = {}
-
-intents = discord.Intents.all()
-bot = commands.Bot(command_prefix="!", intents=intents)
-
-CHANNEL_ID = int(os.getenv("CHANNEL_ID"))
-TOKEN = os.getenv("TOKEN")
-
-URL = "https://jwflab.com/en/warframe-prime-order/"
-CACHE = {"data": None, "timestamp": 0}
-CACHE_TTL = 3600  # 1 hour
-
-
-# -----------------------------
-# Utility
-# -----------------------------
-def get_next_reset(reset_hour, tz):
-    tzinfo = pytz.timezone(tz)
-    now = datetime.datetime.now(tzinfo)
-    reset = now.replace(hour=reset_hour, minute=0, second=0, microsecond=0)
-    if now >= reset:
-        reset += datetime.timedelta(days=1)
-    return int(reset.timestamp())
-
-def parse_reminder_time(input_str: str):
-    now = datetime.datetime.now(pytz.timezone("Europe/Berlin"))
-
-    # 1️⃣ Absolute date
-    try:
-        absolute = datetime.datetime.strptime(input_str, "%d/%m/%Y %H:%M")
-        return pytz.timezone("Europe/Berlin").localize(absolute).astimezone(pytz.UTC)
-    except ValueError:
-        pass
-
-    # 2️⃣ Relative time: e.g., 1d2h15m, 2h30m, 45m
-    pattern = r"(?:(?P<days>\d+)d)?(?:(?P<hours>\d+)h)?(?:(?P<minutes>\d+)m)?"
-    match = re.fullmatch(pattern, input_str.strip())
-    if match:
-        days = int(match.group("days") or 0)
-        hours = int(match.group("hours") or 0)
-        minutes = int(match.group("minutes") or 0)
-        delta = datetime.timedelta(days=days, hours=hours, minutes=minutes)
-        target_time = now + delta
-        return target_time.astimezone(pytz.UTC)
-
-    raise ValueError("Invalid time format")
-
-def format_german_time(dt_utc: datetime.datetime):
-    berlin = pytz.timezone("Europe/Berlin")
-    dt_local = dt_utc.astimezone(berlin)
-    today = datetime.datetime.now(berlin).date()
-    tomorrow = today + datetime.timedelta(days=1)
-
-    if dt_local.date() == today:
-        day_str = "heute"
-    elif dt_local.date() == tomorrow:
-        day_str = "morgen"
-    else:
-        day_str = dt_local.strftime("%d/%m/%Y")  # fallback
-
-    return f"{day_str} um {dt_local.strftime('%H:%M')} Uhr"
-
-# warframe prime scraper
-def fetch_prime_data():
-    r = requests.get(URL, timeout=15)
-    r.raise_for_status()
-
-    soup = BeautifulSoup(r.text, "html.parser")
-
-    content = soup.select_one("#post-2010 .cm-entry-summary")
-    if not content:
-        raise Exception("Content container not found")
-
-    # --- Find prediction table ---
-    target_table = None
-    for table in content.find_all("table"):
-        headers = [th.get_text(strip=True) for th in table.find_all("th")]
-        if "Prime" in headers and "Scheduled Prime release" in headers:
-            target_table = table
-            break
-
-    if not target_table:
-        raise Exception("Prime schedule table not found")
-
-    # --- Get confirmed prime safely ---
-    confirmed = None
-
-    # Collect paragraphs before table
-    paragraphs = []
-    for element in content.children:
-        if element == target_table:
-            break
-        if getattr(element, "name", None) == "p":
-            paragraphs.append(element)
-
-    # Walk backwards from closest to table
-    for p in reversed(paragraphs):
-        text = p.get_text(strip=True)
-
-        # Structural filter
-        if "(" in text and ")" in text and "," in text:
-            confirmed = text
-            break
-
-    # --- Get full predicted list ---
-    results = []
-    rows = target_table.find("tbody").find_all("tr")
-
-    for row in rows:
-        cols = row.find_all("td")
-        if len(cols) < 3:
-            continue
-
-        prime_name = cols[1].get_text(strip=True)
-        release_date = cols[2].get_text(strip=True)
-
-        if prime_name and release_date:
-            results.append((prime_name, release_date))
-
-    return confirmed, results
-
-# send prime schedule cached
-def get_prime_schedule_cached():
-    now = time.time()
-
-    if CACHE["data"] and now - CACHE["timestamp"] < CACHE_TTL:
-        return CACHE["data"]
-
-    data = fetch_prime_data()
-    CACHE["data"] = data
-    CACHE["timestamp"] = now
-    return data
-
-# -----------------------------
-# Core Bot Logic
-# -----------------------------
-async def update_or_create_messages():
-    channel = bot.get_channel(CHANNEL_ID)
-    if not channel:
-        print("⚠️ Channel not found")
-        return
-
-    GAMES = await get_all_games()
-
-    for game, info in GAMES.items():
-        reset_timestamp = get_next_reset(info["reset_hour"], info["tz"])
-        embed = discord.Embed(title=f"{game} Daily Reset", color=discord.Color.blurple())
-        embed.add_field(
-            name="Next Reset",
-            value=f"<t:{reset_timestamp}:R> (<t:{reset_timestamp}:t>)",
-            inline=False
-        )
-        if info["icon"]:
-            embed.set_thumbnail(url=info["icon"])
-
-        msg_id = await get_message_id(game)
-        if msg_id:
-            try:
-                msg = await channel.fetch_message(msg_id)
-                await msg.edit(embed=embed)
-                print(f"✏️ Updated message for {game}")
-            except discord.NotFound:
-                msg = await channel.send(embed=embed)
-                await save_message_id(game, msg.id)
-                print(f"♻️ Recreated message for {game}")
-        else:
-            msg = await channel.send(embed=embed)
-            await save_message_id(game, msg.id)
-            print(f"✅ Created message for {game}")
-        
-        await asyncio.sleep(5) # added cooldown of 5 sec since we got rate limited pretty hard (429)
-
-    print("✅ Updated all messages")
 
 # -----------------------------
-# Events / Tasks
+# Events
 # -----------------------------
 @bot.event
 async def on_ready():
-    print(f"✅ Logged in as {bot.user}")
-    await init_db()
-    await bot.change_presence(activity=discord.Game(name="🐈 with my Kitty Timers uwu"))
-    auto_update.start() # start game reset loop
-    reminder_loop.start() # start reminder loop
-
-    try:
-        synced = await bot.tree.sync()
-        print(f"🔗 Synced {len(synced)} slash commands")
-    except Exception as e:
-        print(f"⚠️ Failed to sync: {e}")
-
-
-# game reset loop (30 min)
-@tasks.loop(minutes=30) 
-async def auto_update():
-    await update_or_create_messages()
-
-# reminder loop (once every min check)
-@tasks.loop(seconds=60)
-async def reminder_loop():
-    due = await get_due_reminders()
-    for reminder in due:
-        reminder_id, user_id, reason, remind_at, channel_id, recurring_interval = reminder
-        channel = bot.get_channel(int(channel_id))
-        if channel:
-
-            remind_dt = datetime.datetime.fromisoformat(remind_at)
-            if remind_dt.tzinfo is None:
-                remind_dt = remind_dt.replace(tzinfo=pytz.UTC)
-
-            embed = discord.Embed(
-                title="⏰ Reminder",
-                description=reason,
-                color=discord.Color.blurple(),
-                timestamp=remind_dt
-            )
-            embed.set_footer(text=f"made with UwU")
-            
-            # Mention user in content to actually ping
-            await channel.send(content=f"<@{user_id}>", embed=embed)
-
-        # Handle recurring reminders
-        if recurring_interval:
-            new_time = datetime.datetime.fromisoformat(remind_at) + datetime.timedelta(seconds=recurring_interval)
-            await update_reminder_time(reminder_id, new_time)
-        else:
-            await delete_reminder(reminder_id)
-
-# -----------------------------
-# Slash Commands
-# -----------------------------
-@bot.tree.command(name="disconnect", description="Schedule a voice disconnect at a given time (HH:MM 24h, German time)")
-async def disconnect(interaction: discord.Interaction, time: str):
-    try:
-        target_time = datetime.datetime.strptime(time, "%H:%M").time()
-        now = datetime.datetime.now(tz)
-        target_datetime = tz.localize(datetime.datetime.combine(now.date(), target_time))
-        if target_datetime <= now:
-            target_datetime += datetime.timedelta(days=1)
-        delta = (target_datetime - now).total_seconds()
-
-        await interaction.response.send_message(
-            f"✅ Will disconnect everyone in voice at **{target_time.strftime('%H:%M')}**"
-        )
-
-        async def disconnect_task():
-            await asyncio.sleep(delta)
-            for vc in interaction.guild.voice_channels:
-                for member in vc.members:
-                    await member.move_to(None)
-            #await interaction.followup.send("🔌 Everyone has been disconnected.")
-
-        # Cancel previous one if exists
-        if interaction.guild.id in disconnect_tasks:
-            disconnect_tasks[interaction.guild.id].cancel()
-
-        task = asyncio.create_task(disconnect_task())
-        disconnect_tasks[interaction.guild.id] = task
-
-    except ValueError:
-        await interaction.response.send_message("❌ Invalid time format! Use HH:MM (24h).")
-
-    except ValueError:
-        await interaction.response.send_message("❌ Invalid time format! Use HH:MM (24h).")
-
-@bot.tree.command(name="remind_me", description="Set a reminder")
-async def remind_me(interaction: discord.Interaction, reason: str, time: str):
-    try:
-        # Parse time (absolute or relative)
-        remind_time_utc = parse_reminder_time(time)
-
-        # Save reminder in DB
-        await add_reminder(
-            str(interaction.user.id),
-            reason,
-            remind_time_utc,
-            str(interaction.channel.id)
-        )
-
-        # Human-readable relative time
-        delta = remind_time_utc - datetime.datetime.now(pytz.UTC)
-        total_minutes = int(delta.total_seconds() // 60)
-        days, remainder = divmod(total_minutes, 1440)  # 1440 = 24*60
-        hours, minutes = divmod(remainder, 60)
-
-        parts = []
-        if days:
-            parts.append(f"{days}d")
-        if hours:
-            parts.append(f"{hours}h")
-        if minutes:
-            parts.append(f"{minutes}m")
-        human_relative = "".join(parts)
-
-        german_time = format_german_time(remind_time_utc)
-
-        # Confirm to user
-        await interaction.response.send_message(
-            f"✅ Reminder set for **{german_time}** ({human_relative} from now): {reason}",
-            ephemeral=True
-        )
-
-    except ValueError:
-        await interaction.response.send_message(
-            "❌ Invalid time format! Use either DD/MM/YYYY HH:MM or relative time like 1d2h30m.",
-            ephemeral=True
-        )
-
-@bot.tree.command(name="reminders", description="List all current reminders")
-async def reminders(interaction: discord.Interaction):
-    all_reminders = await get_all_reminders()
-
-    if not all_reminders:
-        await interaction.response.send_message("📭 No reminders currently set.")
-        return
-
-    embed = discord.Embed(title="⏰ Current Reminders", color=discord.Color.blurple())
-
-    for reminder in all_reminders:
-        reminder_id, user_id, reason, remind_at, channel_id, recurring_interval = reminder
-        remind_dt = datetime.datetime.fromisoformat(remind_at)
-        if remind_dt.tzinfo is None:
-            remind_dt = remind_dt.replace(tzinfo=pytz.UTC)
-
-        german_time = format_german_time(remind_dt)
-        recurring_text = f" (recurs every {recurring_interval}s)" if recurring_interval else ""
-        embed.add_field(
-            name=f"🆔 {reminder_id} — <@{user_id}> – {german_time}{recurring_text}",
-            value=reason,
-            inline=False
-        )
-
-    await interaction.response.send_message(embed=embed)
-
-@bot.tree.command(name="cancel_disconnect", description="Cancel the scheduled voice disconnect for this server")
-async def cancel_disconnect(interaction: discord.Interaction):
-    guild_id = interaction.guild.id
-    if guild_id in disconnect_tasks:
-        task = disconnect_tasks[guild_id]
-        task.cancel()
-        del disconnect_tasks[guild_id]
-        await interaction.response.send_message("❌ Scheduled disconnect has been cancelled.")
-    else:
-        await interaction.response.send_message("ℹ️ No disconnect is currently scheduled.")
-
-@bot.tree.command(name="cancel_reminder", description="Cancel one of your reminders")
-async def cancel_reminder(interaction: discord.Interaction, reminder_id: int):
-    all_reminders = await get_all_reminders()
-    target = next((r for r in all_reminders if r[0] == reminder_id and str(r[1]) == str(interaction.user.id)), None)
-
-    if not target:
-        await interaction.response.send_message(
-            "❌ Reminder not found or you don’t have permission to delete it.",
-            ephemeral=True
-        )
-        return
-
-    await delete_reminder(reminder_id)
-    await interaction.response.send_message(
-        f"🗑️ Reminder **{reminder_id}** has been cancelled.",
-        ephemeral=True
-    )
-
-# warframe prime command
-@bot.tree.command(name="prime_schedule", description="Shows the current Warframe Prime release order")
-async def primes(interaction: discord.Interaction):
-    await interaction.response.defer()
-
-    try:
-        confirmed, primes = get_prime_schedule_cached()
-
-        embed = discord.Embed(
-            title="Warframe Prime Release Schedule",
-            color=0xE0C16F
-        )
-
-        # cOwOnfirmed Prime at top
-        if confirmed:
-            embed.add_field(
-                name="Next Confirmed Prime Frame:",
-                value=f"**{confirmed}**",
-                inline=False
-            )
-        else:
-            embed.add_field(
-                name="Next Confirmed Prime Frame:",
-                value="No confirmed Prime announced yet.",
-                inline=False
-            )
-
-        # space
-        #embed.add_field(name="\u200b", value="\u200b", inline=False)
-
-        # full predicted list :3
-        formatted_lines = [
-            f"**{name} Prime** — {date}"
-            for name, date in primes
-        ]
-
-        embed.add_field(
-            name="Predicted Release Order",
-            value="\n".join(formatted_lines),
-            inline=False
-        )
-
-        embed.set_footer(text="Source: jwflab.com | Auto-updated hourly")
+    log.info("✅ Logged in as %s", bot.user)
+    if bot.ready_after is not None:
+        return # gateway reconnect, everything is already running
 
-        await interaction.followup.send(embed=embed)
+    # the cogs start their schedulers from their own on_ready listeners
+    bot.ready_after = time.perf_counter() - BOOT_STARTED
+    STARTUP.observe(bot.ready_after, "ready")
+    log.info("🚀 Ready in %.2fs", bot.ready_after, extra={"latency": round(bot.ready_after, 3)})
 
-    except Exception as e:
-        await interaction.followup.send(
-            f"Error fetching data: {e}",
-            ephemeral=True
-        )
 
-bot.run(TOKEN)
+if __name__ == "__main__":
+    logs.setup()
+    bot.run(TOKEN, log_handler=None) # discord.py logs through our queue too
@@ -0,0 +1,166 @@
+# metrics.py
+import bisect
+import contextlib
+import functools
+import time
+
+from aiohttp import web
+
+METRICS_HOST = "127.0.0.1"
+
+# seconds; covers sub-ms DB calls up to minute-long stalls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REGISTRY = []
+
+
+class Counter:
+    """Monotonic counter. Label values are passed positionally: ``inc("hit")``."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        REGISTRY.append(self)
+
+    def inc(self, *labels, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def total(self):
+        return sum(self.values.values())
+
+    def samples(self):
+        for labels, value in self.values.items():
+            yield self.name, labels, (), value
+
+
+class Histogram:
+    """Fixed-bucket histogram: one bisect and three additions per observation."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.values = {}  # labels -> [bucket counts..., +Inf count, sum]
+        REGISTRY.append(self)
+
+    def observe(self, value: float, *labels):
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    @contextlib.contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels):
+        series = self.values.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def quantile(self, q: float, *labels):
+        """Upper bucket bound containing the q-quantile (inf if it is past the last bucket)."""
+        series = self.values.get(labels)
+        if not series:
+            return None
+        target = q * sum(series[:-1])
+        seen = 0
+        for bound, n in zip(self.buckets + (float("inf"),), series[:-1]):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def samples(self):
+        for labels, series in self.values.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += n
+                yield f"{self.name}_bucket", labels, (("le", _format_bound(bound)),), cumulative
+            yield f"{self.name}_sum", labels, (), series[-1]
+            yield f"{self.name}_count", labels, (), cumulative
+
+
+def _format_bound(bound: float):
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, extra, value in metric.samples():
+            pairs = list(zip(metric.labelnames, labels)) + list(extra)
+            label_str = "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}" if pairs else ""
+            lines.append(f"{name}{label_str} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def timed(histogram: Histogram, label: str = None):
+    """Decorator: observe the run time of an async function, labelled with its name."""
+    def decorator(fn):
+        name = label or fn.__name__
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, name)
+        return wrapper
+    return decorator
+
+
+# -----------------------------
+# Bot metrics
+# -----------------------------
+LOOP_TICK = Histogram("blushy_loop_tick_seconds", "Duration of one background loop tick", ("loop",))
+DB_CALL = Histogram("blushy_db_call_seconds", "Latency of database.py helpers", ("fn",))
+REMINDER_LATENESS = Histogram(
+    "blushy_reminder_lateness_seconds", "Reminder send time minus remind_at",
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 300, 3600)
+)
+RATE_LIMITED = Counter("blushy_http_429_total", "Discord 429 responses, including the ones discord.py retried", ("route",))
+SCRAPER_CACHE = Counter("blushy_scraper_cache_total", "Prime schedule cache lookups", ("result",))
+DB_CACHE = Counter("blushy_db_cache_total", "Read-through cache lookups for games/game_resets", ("table", "result"))
+STARTUP = Histogram("blushy_startup_seconds", "Seconds from process start until each boot phase finished", ("phase",))
+RELOAD = Histogram("blushy_reload_seconds", "Duration of one /reload", ("extension",))
+
+
+# -----------------------------
+# HTTP endpoint
+# -----------------------------
+async def _handle_metrics(request):
+    return web.Response(text=render(), content_type="text/plain", charset="utf-8")
+
+
+async def start_http_server(port: int, host: str = METRICS_HOST):
+    """Serve /metrics on a local port. Returns the runner (call ``cleanup()`` to stop)."""
+    app = web.Application()
+    app.router.add_get("/metrics", _handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+    except OSError:
+        await runner.cleanup()
+        raise
+    return runner
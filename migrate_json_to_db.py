@@ -1,61 +1,203 @@
 # migrate_json_to_db.py
 
+import argparse
 import json
 import asyncio
 import os
-import aiosqlite
-from database import init_db, add_game, save_message_id
+import time
+from database import init_db, close_db, get_pool, LEGACY_GUILD_ID
 
 # paths to your old JSON files
 GAMES_JSON = "games.json"
 RESETS_JSON = "game_resets.json"
 
+BATCH_SIZE = 5000
+CHUNK_SIZE = 64 * 1024
 
-async def migrate():
-    # 1️⃣ Initialize database and create tables
-    await init_db()
+GAME_SQL = {
+    "ignore": "INSERT OR IGNORE INTO games (guild_id, name, reset_hour, tz, icon) VALUES (?, ?, ?, ?, ?)",
+    "upsert": """
+        INSERT INTO games (guild_id, name, reset_hour, tz, icon) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(guild_id, name) DO UPDATE SET
+            reset_hour = excluded.reset_hour, tz = excluded.tz, icon = excluded.icon
+    """,
+}
+# message ids always point at the newest message, so they are upserted in every mode
+RESET_SQL = """
+    INSERT INTO game_resets (guild_id, game_name, message_id) VALUES (?, ?, ?)
+    ON CONFLICT(guild_id, game_name) DO UPDATE SET message_id = excluded.message_id
+"""
+# replace = wipe the guild's rows in both tables first, then plain inserts
+GAME_SQL["replace"] = GAME_SQL["ignore"]
 
-    # 2️⃣ Load JSON files
-    if not os.path.exists(GAMES_JSON):
-        print(f"❌ {GAMES_JSON} not found!")
-        return
-    if not os.path.exists(RESETS_JSON):
-        print(f"⚠️ {RESETS_JSON} not found — skipping message IDs")
+def iter_json_object(path: str, chunk_size: int = CHUNK_SIZE):
+    """Yield (key, value) pairs of a top-level JSON object without loading the whole file."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def skip_ws():
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos].isspace():
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                fill()
+
+        def decode():
+            # only trust a value that is followed by more input (a number could be cut off)
+            nonlocal pos
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    if end < len(buf) or eof:
+                        pos = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill()
 
-    with open(GAMES_JSON, "r") as f:
-        games_data = json.load(f)
+        def expect(char):
+            nonlocal pos
+            skip_ws()
+            if pos >= len(buf) or buf[pos] != char:
+                raise ValueError(f"{path}: expected '{char}' while streaming JSON")
+            pos += 1
 
-    with open(RESETS_JSON, "r") as f:
-        resets_data = json.load(f)
+        fill()
+        expect("{")
+        skip_ws()
+        if pos < len(buf) and buf[pos] == "}":
+            return
+        while True:
+            skip_ws()
+            key = decode()
+            expect(":")
+            skip_ws()
+            yield key, decode()
+            skip_ws()
+            if pos < len(buf) and buf[pos] == ",":
+                pos += 1
+                continue
+            expect("}")
+            return
 
-    # 3️⃣ Insert games into DB
-    print("📥 Inserting games...")
-    for name, info in games_data.items():
-        await add_game(
+
+def batched(items, size: int):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def game_rows(path: str, guild_id: int):
+    for name, info in iter_json_object(path):
+        yield (
+            guild_id,
             name,
             info.get("reset_hour", 0),
             info.get("tz", "Etc/GMT"),
-            info.get("icon", "")
+            info.get("icon", "") or ""
         )
-    print(f"✅ Imported {len(games_data)} games")
 
-    # 4️⃣ Insert game reset message IDs
-    if resets_data:
-        print("📨 Inserting message IDs...")
-        for game_name, msg_id in resets_data.items():
-            await save_message_id(game_name, msg_id)
-        print(f"✅ Imported {len(resets_data)} message IDs")
 
-    print("🎉 Migration complete!")
+def reset_rows(path: str, guild_id: int):
+    for game_name, msg_id in iter_json_object(path):
+        yield guild_id, game_name, msg_id
 
 
-if __name__ == "__main__":
-    asyncio.run(migrate())
+async def bulk_insert(db, sql: str, rows, batch_size: int):
+    """executemany in batches; returns (rows read, rows written)."""
+    read = written = 0
+    for batch in batched(rows, batch_size):
+        cursor = await db.executemany(sql, batch)
+        read += len(batch)
+        written += max(cursor.rowcount, 0)
+        await cursor.close()
+    return read, written
+
+
+async def migrate(games_path: str = GAMES_JSON, resets_path: str = RESETS_JSON,
+                  mode: str = "ignore", batch_size: int = BATCH_SIZE, dry_run: bool = False,
+                  guild_id: int = LEGACY_GUILD_ID):
+    # 1️⃣ Initialize database and create tables
+    await init_db()
+
+    # 2️⃣ Check JSON files
+    if not os.path.exists(games_path):
+        print(f"❌ {games_path} not found!")
+        return
+    if not os.path.exists(resets_path):
+        print(f"⚠️ {resets_path} not found — skipping message IDs")
+        resets_path = None
+
+    start = time.perf_counter()
+    pool = await get_pool()
+    # everything runs in one transaction: one commit (one fsync) for the whole import
+    async with pool.write() as db:
+        if mode == "replace":
+            await db.execute("DELETE FROM game_resets WHERE guild_id = ?", (guild_id,))
+            await db.execute("DELETE FROM games WHERE guild_id = ?", (guild_id,))
+
+        # 3️⃣ Insert games into DB
+        print("📥 Inserting games...")
+        games_read, games_written = await bulk_insert(db, GAME_SQL[mode], game_rows(games_path, guild_id), batch_size)
+        print(f"✅ Imported {games_written}/{games_read} games")
 
-async def add_channel_column():
-    async with aiosqlite.connect("data.db") as db:
-        await db.execute("ALTER TABLE reminders ADD COLUMN channel_id TEXT")
-        await db.commit()
-        print("✅ Added channel_id column")
+        # 4️⃣ Insert game reset message IDs
+        resets_read = resets_written = 0
+        if resets_path:
+            print("📨 Inserting message IDs...")
+            resets_read, resets_written = await bulk_insert(db, RESET_SQL, reset_rows(resets_path, guild_id), batch_size)
+            print(f"✅ Imported {resets_written}/{resets_read} message IDs")
 
-#asyncio.run(add_channel_column())
\ No newline at end of file
+        if dry_run:
+            await db.rollback()  # write() only commits what is still pending
+
+    elapsed = time.perf_counter() - start
+    total = games_read + resets_read
+    rate = total / elapsed if elapsed else float("inf")
+    print(f"⏱️ {total} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+    print("🧪 Dry run — nothing was written." if dry_run else "🎉 Migration complete!")
+    return {
+        "games": (games_read, games_written),
+        "resets": (resets_read, resets_written),
+        "seconds": elapsed,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Import games.json / game_resets.json into data.db")
+    parser.add_argument("--games", default=GAMES_JSON)
+    parser.add_argument("--resets", default=RESETS_JSON)
+    parser.add_argument("--mode", choices=("ignore", "upsert", "replace"), default="ignore",
+                        help="ignore existing rows, update them, or wipe the tables first")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="run the import and roll it back")
+    parser.add_argument("--guild", type=int, default=LEGACY_GUILD_ID,
+                        help="guild id to import into (default: unassigned, claimed by the CHANNEL_ID guild)")
+    args = parser.parse_args()
+    try:
+        await migrate(args.games, args.resets, args.mode, args.batch_size, args.dry_run, args.guild)
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,307 @@
+# migrations.py
+import datetime
+import time
+
+from logs import get_logger
+
+log = get_logger("db")
+
+# (version, coroutine) in ascending order, filled by @migration
+MIGRATIONS = []
+
+
+def migration(version: int):
+    """Register ``async def fn(db)`` as schema migration ``version``."""
+    def decorator(fn):
+        MIGRATIONS.append((version, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return decorator
+
+
+async def get_schema_version(db) -> int:
+    async with db.execute("SELECT MAX(version) FROM schema_version") as cursor:
+        row = await cursor.fetchone()
+        return row[0] or 0
+
+
+async def run_migrations(db):
+    """Apply every pending migration, each one in its own transaction."""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            applied_at INTEGER NOT NULL
+        )
+    """)
+    await db.commit()
+
+    current = await get_schema_version(db)
+    for version, fn in MIGRATIONS:
+        if version <= current:
+            continue
+        # processes sharing data.db (shards, reminder_worker.py) start together after an
+        # upgrade: take the write lock first, then check nobody applied this one meanwhile
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            current = await get_schema_version(db)
+            if version <= current:
+                await db.commit()
+                continue
+            await fn(db)
+            await db.execute(
+                "INSERT INTO schema_version (version, applied_at) VALUES (?, ?)",
+                (version, int(time.time()))
+            )
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+        log.info("🗄️ Applied migration %d: %s", version, fn.__doc__, extra={"version": version})
+
+
+def to_epoch(value) -> int:
+    """Convert a stored timestamp (epoch, ISO text, naive = UTC) to epoch seconds."""
+    if value is None:
+        return int(time.time())
+    if isinstance(value, (int, float)):
+        return int(value)
+    dt = datetime.datetime.fromisoformat(str(value))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return int(dt.timestamp())
+
+
+async def _columns(db, table: str):
+    async with db.execute(f"PRAGMA table_info({table})") as cursor:
+        return {row[1] for row in await cursor.fetchall()}
+
+
+# -----------------------------
+# MIGRATIONS
+# -----------------------------
+@migration(1)
+async def baseline_schema(db):
+    """baseline schema (games, game_resets, reminders)"""
+    # game reset table 1
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS games (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE,
+            reset_hour INTEGER,
+            tz TEXT,
+            icon TEXT
+        )
+    """)
+
+    # game reset table 2
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS game_resets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            game_name TEXT UNIQUE,
+            message_id INTEGER,
+            FOREIGN KEY(game_name) REFERENCES games(name)
+        )
+    """)
+
+    # reminder DB table (to store reminders of users and recurring ones)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS reminders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT,
+            reason TEXT,
+            remind_at DATETIME,
+            channel_id TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            recurring_interval INTEGER DEFAULT NULL
+        )
+    """)
+
+    # very old databases were created before reminders had a channel
+    if "channel_id" not in await _columns(db, "reminders"):
+        await db.execute("ALTER TABLE reminders ADD COLUMN channel_id TEXT")
+
+
+@migration(2)
+async def reminders_epoch_timestamps(db):
+    """reminders: integer epoch remind_at/created_at + indexes"""
+    await db.execute("""
+        CREATE TABLE reminders_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT,
+            reason TEXT,
+            remind_at INTEGER NOT NULL,
+            channel_id TEXT,
+            created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+            recurring_interval INTEGER DEFAULT NULL
+        )
+    """)
+
+    async with db.execute(
+        "SELECT id, user_id, reason, remind_at, channel_id, created_at, recurring_interval FROM reminders"
+    ) as cursor:
+        rows = await cursor.fetchall()
+    await db.executemany(
+        "INSERT INTO reminders_new (id, user_id, reason, remind_at, channel_id, created_at, recurring_interval) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (rid, user_id, reason, to_epoch(remind_at), channel_id, to_epoch(created_at), interval)
+            for rid, user_id, reason, remind_at, channel_id, created_at, interval in rows
+        ]
+    )
+
+    await db.execute("DROP TABLE reminders")
+    await db.execute("ALTER TABLE reminders_new RENAME TO reminders")
+    await db.execute("CREATE INDEX idx_reminders_remind_at ON reminders(remind_at)")
+    await db.execute("CREATE INDEX idx_reminders_user_id ON reminders(user_id)")
+    await db.execute("CREATE INDEX idx_reminders_channel_id ON reminders(channel_id)")
+
+
+@migration(3)
+async def game_resets_embed_hash(db):
+    """game_resets: fingerprint of the last rendered embed"""
+    await db.execute("ALTER TABLE game_resets ADD COLUMN embed_hash TEXT")
+
+
+@migration(4)
+async def scraper_cache_table(db):
+    """scraper_cache: persisted HTTP validators + parsed payloads"""
+    await db.execute("""
+        CREATE TABLE scraper_cache (
+            key TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            payload TEXT NOT NULL,
+            fetched_at INTEGER NOT NULL
+        )
+    """)
+
+
+@migration(5)
+async def reminders_keyset_indexes(db):
+    """reminders: (user_id|channel_id, remind_at, id) indexes for keyset pagination"""
+    await db.execute("DROP INDEX IF EXISTS idx_reminders_user_id")
+    await db.execute("DROP INDEX IF EXISTS idx_reminders_channel_id")
+    await db.execute("CREATE INDEX idx_reminders_user_due ON reminders(user_id, remind_at, id)")
+    await db.execute("CREATE INDEX idx_reminders_channel_due ON reminders(channel_id, remind_at, id)")
+
+
+@migration(6)
+async def reminders_recurrence_rules(db):
+    """reminders: calendar recurrence rule + catch-up policy"""
+    await db.execute("ALTER TABLE reminders ADD COLUMN recurrence TEXT DEFAULT NULL")
+    await db.execute("ALTER TABLE reminders ADD COLUMN catch_up TEXT NOT NULL DEFAULT 'one'")
+
+
+@migration(7)
+async def disconnect_jobs_table(db):
+    """disconnect_jobs: persisted /disconnect schedules"""
+    await db.execute("""
+        CREATE TABLE disconnect_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            run_at INTEGER NOT NULL,
+            channel_id INTEGER DEFAULT NULL,
+            member_id INTEGER DEFAULT NULL,
+            created_by INTEGER,
+            created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+        )
+    """)
+    await db.execute("CREATE INDEX idx_disconnect_jobs_guild ON disconnect_jobs(guild_id)")
+
+
+@migration(8)
+async def guild_scoped_games(db):
+    """per-guild config; games and game_resets scoped by guild_id (0 = unassigned legacy rows)"""
+    await db.execute("""
+        CREATE TABLE guild_config (
+            guild_id INTEGER PRIMARY KEY,
+            reset_channel_id INTEGER DEFAULT NULL,
+            disconnect_tz TEXT NOT NULL DEFAULT 'Europe/Berlin'
+        )
+    """)
+
+    await db.execute("""
+        CREATE TABLE games_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL DEFAULT 0,
+            name TEXT NOT NULL,
+            reset_hour INTEGER,
+            tz TEXT,
+            icon TEXT,
+            UNIQUE(guild_id, name)
+        )
+    """)
+    await db.execute("""
+        INSERT INTO games_new (id, guild_id, name, reset_hour, tz, icon)
+        SELECT id, 0, name, reset_hour, tz, icon FROM games WHERE name IS NOT NULL
+    """)
+    await db.execute("DROP TABLE games")
+    await db.execute("ALTER TABLE games_new RENAME TO games")
+
+    await db.execute("""
+        CREATE TABLE game_resets_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL DEFAULT 0,
+            game_name TEXT NOT NULL,
+            message_id INTEGER,
+            embed_hash TEXT,
+            UNIQUE(guild_id, game_name)
+        )
+    """)
+    await db.execute("""
+        INSERT INTO game_resets_new (id, guild_id, game_name, message_id, embed_hash)
+        SELECT id, 0, game_name, message_id, embed_hash FROM game_resets WHERE game_name IS NOT NULL
+    """)
+    await db.execute("DROP TABLE game_resets")
+    await db.execute("ALTER TABLE game_resets_new RENAME TO game_resets")
+
+
+@migration(9)
+async def bot_state(db):
+    """bot_state: small key/value store (slash command tree hash, ...)"""
+    await db.execute("""
+        CREATE TABLE bot_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    """)
+
+
+@migration(10)
+async def dashboard_mode(db):
+    """compact dashboard: per-guild toggle + message ids of the dashboard pages"""
+    await db.execute("ALTER TABLE guild_config ADD COLUMN dashboard INTEGER NOT NULL DEFAULT 0")
+    await db.execute("""
+        CREATE TABLE dashboard_messages (
+            guild_id INTEGER NOT NULL,
+            page INTEGER NOT NULL,
+            message_id INTEGER NOT NULL,
+            embed_hash TEXT,
+            PRIMARY KEY (guild_id, page)
+        )
+    """)
+
+
+@migration(11)
+async def reminder_leases(db):
+    """reminders: lease owner + expiry so several dispatchers never send the same row"""
+    await db.execute("ALTER TABLE reminders ADD COLUMN lease_owner TEXT DEFAULT NULL")
+    await db.execute("ALTER TABLE reminders ADD COLUMN lease_expires INTEGER DEFAULT NULL")
+
+
+@migration(12)
+async def reminder_deliveries(db):
+    """reminder_deliveries: bounded history of what happened to each due reminder"""
+    await db.execute("""
+        CREATE TABLE reminder_deliveries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            reminder_id INTEGER NOT NULL,
+            user_id TEXT,
+            channel_id TEXT,
+            remind_at INTEGER,
+            delivered_at INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            worker_id TEXT
+        )
+    """)
+    await db.execute("CREATE INDEX idx_reminder_deliveries_reminder ON reminder_deliveries (reminder_id)")
@@ -0,0 +1,173 @@
+# prime_scraper.py
+import asyncio
+import functools
+import json
+import time
+
+import aiohttp
+
+from database import get_scraper_cache, save_scraper_cache
+from metrics import SCRAPER_CACHE
+from logs import get_logger
+
+log = get_logger("scraper")
+
+URL = "https://jwflab.com/en/warframe-prime-order/"
+CACHE_KEY = "prime_schedule"
+CACHE_TTL = 3600  # 1 hour, after that answers are served stale while we revalidate
+FETCH_TIMEOUT = 15
+
+
+# bs4 is only needed once the page is actually parsed, keep it off the startup path
+@functools.lru_cache(maxsize=None)
+def _post_strainer():
+    # only the post body is turned into a tree, the rest of the page is skipped while parsing
+    from bs4 import SoupStrainer
+    return SoupStrainer(id="post-2010")
+
+
+def _is_schedule_table(table):
+    headers = [th.get_text(strip=True) for th in table.find_all("th")]
+    return "Prime" in headers and "Scheduled Prime release" in headers
+
+
+# warframe prime page parser (CPU bound, runs in a worker thread)
+def parse_prime_page(html: str):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser", parse_only=_post_strainer())
+
+    content = soup.select_one("#post-2010 .cm-entry-summary")
+    if not content:
+        raise Exception("Content container not found")
+
+    # --- Single pass: last "Name (a, b, c)" paragraph before the prediction table ---
+    confirmed = None
+    target_table = None
+    for element in content.children:
+        name = getattr(element, "name", None)
+        if name == "p":
+            text = element.get_text(strip=True)
+            # Structural filter
+            if "(" in text and ")" in text and "," in text:
+                confirmed = text
+        elif name is not None:
+            tables = [element] if name == "table" else element.find_all("table")
+            target_table = next((t for t in tables if _is_schedule_table(t)), None)
+            if target_table:
+                break
+
+    if not target_table:
+        raise Exception("Prime schedule table not found")
+
+    # --- Get full predicted list ---
+    results = []
+    rows = target_table.find("tbody").find_all("tr")
+
+    for row in rows:
+        cols = row.find_all("td")
+        if len(cols) < 3:
+            continue
+
+        prime_name = cols[1].get_text(strip=True)
+        release_date = cols[2].get_text(strip=True)
+
+        if prime_name and release_date:
+            results.append((prime_name, release_date))
+
+    return confirmed, results
+
+
+class PrimeScheduleCache:
+    """Stale-while-revalidate cache for the prime schedule.
+
+    Answers always come from memory. Once the entry is older than ``ttl`` a
+    background refresh revalidates it with If-None-Match/If-Modified-Since;
+    a 304 just bumps the timestamp. Entry and validators are persisted to
+    SQLite so a restart starts warm. Only a completely empty cache waits for
+    the network.
+    """
+
+    def __init__(self, url: str = URL, key: str = CACHE_KEY, ttl: float = CACHE_TTL):
+        self.url = url
+        self.key = key
+        self.ttl = ttl
+        self.data = None
+        self.fetched_at = 0
+        self.etag = None
+        self.last_modified = None
+        self._refresh_task = None
+
+    @property
+    def stale(self):
+        return time.time() - self.fetched_at >= self.ttl
+
+    async def load(self):
+        """Warm the memory cache from SQLite (call once at startup)."""
+        row = await get_scraper_cache(self.key)
+        if row:
+            self.etag, self.last_modified, payload, self.fetched_at = row
+            payload = json.loads(payload)
+            self.data = (payload["confirmed"], [tuple(p) for p in payload["primes"]])
+
+    async def get(self):
+        if self.data is None:
+            SCRAPER_CACHE.inc("miss")
+            # cold cache, nothing to serve yet: every caller waits on the same fetch
+            await asyncio.shield(self.refresh_in_background())
+        elif self.stale:
+            SCRAPER_CACHE.inc("stale")
+            self.refresh_in_background()
+        else:
+            SCRAPER_CACHE.inc("hit")
+        return self.data
+
+    def refresh_in_background(self):
+        """Start a refresh unless one is running (single flight); returns its task."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+            self._refresh_task.add_done_callback(self._refresh_done)
+        return self._refresh_task
+
+    def _refresh_done(self, task):
+        if not task.cancelled() and task.exception() is not None:
+            log.warning("⚠️ Prime schedule refresh failed%s: %s", ", serving stale data" if self.data else "",
+                        task.exception(), extra={"url": URL})
+
+    async def refresh(self):
+        headers = {}
+        if self.data is not None:
+            if self.etag:
+                headers["If-None-Match"] = self.etag
+            if self.last_modified:
+                headers["If-Modified-Since"] = self.last_modified
+
+        timeout = aiohttp.ClientTimeout(total=FETCH_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.get(self.url, headers=headers) as r:
+                if r.status == 304:
+                    self.fetched_at = int(time.time())
+                else:
+                    r.raise_for_status()
+                    html = await r.text()
+                    self.data = await asyncio.to_thread(parse_prime_page, html)
+                    self.etag = r.headers.get("ETag")
+                    self.last_modified = r.headers.get("Last-Modified")
+                    self.fetched_at = int(time.time())
+
+        confirmed, primes = self.data
+        await save_scraper_cache(
+            self.key,
+            self.etag,
+            self.last_modified,
+            json.dumps({"confirmed": confirmed, "primes": primes}),
+            self.fetched_at
+        )
+        return self.data
+
+
+prime_cache = PrimeScheduleCache()
+
+
+# send prime schedule cached
+async def get_prime_schedule_cached():
+    return await prime_cache.get()
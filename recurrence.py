@@ -0,0 +1,184 @@
+# recurrence.py
+import datetime
+import functools
+import re
+
+import pytz
+
+DEFAULT_TZ = "Europe/Berlin"
+
+# what to do with occurrences that were missed while the bot was offline
+CATCH_UP_NONE = "none"  # skip them, only future occurrences are sent
+CATCH_UP_ONE = "one"  # send a single late reminder, then continue on schedule
+CATCH_UP_ALL = "all"  # like "one", but the message says how many were missed
+CATCH_UP_POLICIES = (CATCH_UP_NONE, CATCH_UP_ONE, CATCH_UP_ALL)
+CATCH_UP_GRACE = 300  # up to 5 minutes late still counts as on time
+
+WEEKDAYS = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+WEEKDAY_NAMES = {v: k for k, v in WEEKDAYS.items()}
+WEEKDAY_GROUPS = {
+    "day": None,
+    "weekday": frozenset(range(5)),
+    "weekend": frozenset((5, 6)),
+}
+
+INTERVAL_PATTERN = re.compile(r"(?:(?P<days>\d+)d)?(?:(?P<hours>\d+)h)?(?:(?P<minutes>\d+)m)?")
+CALENDAR_PATTERN = re.compile(
+    r"(?P<days>[a-z,]+)\s+(?P<hour>\d{1,2}):(?P<minute>\d{2})(?:\s+(?P<tz>\S+))?"
+)
+
+
+@functools.lru_cache(maxsize=None)
+def get_zone(name: str):
+    """pytz zone objects are immutable, build each one only once."""
+    return pytz.timezone(name)
+
+
+class IntervalRule:
+    """Fixed interval, anchored on the reminder's own due time (no drift)."""
+
+    def __init__(self, seconds: int):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = int(seconds)
+
+    def advance(self, due: int, now: int):
+        """(missed occurrences in (due, now], first occurrence after now) in O(1)."""
+        missed = max(0, (now - due) // self.seconds)
+        return missed, due + (missed + 1) * self.seconds
+
+    def __str__(self):
+        days, rest = divmod(self.seconds, 86400)
+        hours, rest = divmod(rest, 3600)
+        minutes = rest // 60
+        parts = [f"{v}{u}" for v, u in ((days, "d"), (hours, "h"), (minutes, "m")) if v]
+        return "every " + ("".join(parts) or f"{self.seconds}s")
+
+
+class CalendarRule:
+    """Wall-clock time on some weekdays in a time zone, e.g. "every mon,fri 20:00 Europe/Berlin"."""
+
+    def __init__(self, hour: int, minute: int, weekdays=None, tz: str = DEFAULT_TZ):
+        if not (0 <= hour < 24 and 0 <= minute < 60):
+            raise ValueError("Invalid time of day")
+        self.hour = hour
+        self.minute = minute
+        self.weekdays = frozenset(weekdays) if weekdays else None
+        try:
+            self.zone = get_zone(tz)
+        except pytz.UnknownTimeZoneError:
+            raise ValueError(f"Unknown time zone {tz}")
+        self.tz = tz
+
+    @property
+    def per_week(self):
+        return 7 if self.weekdays is None else len(self.weekdays)
+
+    def next_after(self, ts: int):
+        """First occurrence strictly after ``ts`` (at most 8 candidate days)."""
+        day = datetime.datetime.fromtimestamp(ts, self.zone).date()
+        for offset in range(8):
+            candidate_day = day + datetime.timedelta(days=offset)
+            if self.weekdays is not None and candidate_day.weekday() not in self.weekdays:
+                continue
+            naive = datetime.datetime.combine(candidate_day, datetime.time(self.hour, self.minute))
+            # localize handles DST; a time skipped by spring-forward lands an hour later
+            candidate = int(self.zone.normalize(self.zone.localize(naive)).timestamp())
+            if candidate > ts:
+                return candidate
+        raise ValueError("Rule has no occurrences")
+
+    def _shift_weeks(self, ts: int, weeks: int):
+        """``ts`` moved by whole weeks of local calendar days, keeping its wall-clock time."""
+        local = datetime.datetime.fromtimestamp(ts, self.zone).replace(tzinfo=None) + datetime.timedelta(weeks=weeks)
+        return int(self.zone.normalize(self.zone.localize(local)).timestamp())
+
+    def advance(self, due: int, now: int):
+        """(missed occurrences in (due, now], first occurrence after now), whole weeks skipped arithmetically."""
+        if now <= due:
+            return 0, self.next_after(due)
+        # weeks in local calendar days, across a DST change a week is 167 or 169 hours long
+        days = (datetime.datetime.fromtimestamp(now, self.zone).date()
+                - datetime.datetime.fromtimestamp(due, self.zone).date()).days
+        weeks = days // 7
+        cursor = self._shift_weeks(due, weeks) if weeks else due
+        if cursor > now:
+            # same weekday as due, but now is earlier in the day
+            weeks -= 1
+            cursor = self._shift_weeks(due, weeks) if weeks else due
+        missed = weeks * self.per_week
+        while True:
+            cursor = self.next_after(cursor)
+            if cursor > now:
+                return missed, cursor
+            missed += 1
+
+    def __str__(self):
+        if self.weekdays is None:
+            days = "day"
+        else:
+            days = next((name for name, group in WEEKDAY_GROUPS.items() if group == self.weekdays), None)
+            days = days or ",".join(WEEKDAY_NAMES[d] for d in sorted(self.weekdays))
+        return f"every {days} {self.hour:02d}:{self.minute:02d} {self.tz}"
+
+
+@functools.lru_cache(maxsize=None)
+def reset_rule(reset_hour: int, tz: str):
+    """Shared daily rule for a game's reset hour (built once per hour/zone pair)."""
+    return CalendarRule(reset_hour, 0, None, tz)
+
+
+def parse_rule(text: str):
+    """Parse "every 2h", "every day 20:00", "every mon,fri 08:30 Europe/Berlin", "daily 20:00"."""
+    text = text.strip()
+    lowered = text.lower()
+    if lowered.startswith("daily "):
+        lowered = "every day " + lowered[len("daily "):]
+        text = "every day " + text[len("daily "):]
+    if not lowered.startswith("every "):
+        raise ValueError("Recurrence must start with 'every'")
+    body, original = lowered[len("every "):].strip(), text[len("every "):].strip()
+
+    match = INTERVAL_PATTERN.fullmatch(body)
+    if match and any(match.groupdict().values()):
+        seconds = (int(match.group("days") or 0) * 86400
+                   + int(match.group("hours") or 0) * 3600
+                   + int(match.group("minutes") or 0) * 60)
+        return IntervalRule(seconds)
+
+    match = CALENDAR_PATTERN.fullmatch(body)
+    if not match:
+        raise ValueError("Invalid recurrence")
+    days = match.group("days")
+    if days in WEEKDAY_GROUPS:
+        weekdays = WEEKDAY_GROUPS[days]
+    else:
+        try:
+            weekdays = frozenset(WEEKDAYS[d[:3]] for d in days.split(",") if d)
+        except KeyError:
+            raise ValueError("Invalid weekday")
+    # keep the time zone's original casing, pytz names are case sensitive
+    tz = original.split()[-1] if match.group("tz") else DEFAULT_TZ
+    return CalendarRule(int(match.group("hour")), int(match.group("minute")), weekdays, tz)
+
+
+def rule_from_row(recurring_interval, recurrence):
+    """Rule stored on a reminders row, or None for one-off reminders."""
+    if recurrence:
+        return parse_rule(recurrence)
+    if recurring_interval:
+        return IntervalRule(recurring_interval)
+    return None
+
+
+def plan_occurrence(rule, due: int, now: int, policy: str = CATCH_UP_ONE):
+    """Decide how to handle a due occurrence of a recurring reminder.
+
+    Returns (send, missed, next_due): whether to send now, how many further
+    occurrences were skipped because we were late, and when to fire next.
+    """
+    missed, next_due = rule.advance(due, now)
+    late = now - due > CATCH_UP_GRACE
+    if policy == CATCH_UP_NONE and late:
+        return False, missed + 1, next_due
+    return True, missed, next_due
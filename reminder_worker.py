@@ -0,0 +1,41 @@
+# reminder_worker.py
+# Standalone reminder dispatcher. Leases due reminders from the shared data.db and
+# sends them over the REST API only (no gateway connection, no guild cache).
+#
+# Run any number of these next to the bot (set REMINDER_DISPATCH=0 for the bot if
+# only workers should deliver). Leases make sure every reminder goes out once;
+# if a worker dies, its batch is picked up by the others when the lease expires.
+# Workers poll for new rows on their own, give the bot a REMINDER_POLL if it delivers too.
+#
+#   WORKER_ID=worker-1 python reminder_worker.py
+import asyncio
+
+import logs
+import main
+from database import close_db
+
+log = logs.get_logger("worker")
+
+
+async def run():
+    bot = main.bot
+    bot.rest_only = True
+    bot.reminder_dispatch = True  # REMINDER_DISPATCH=0 only turns delivery off inside the bot
+    await bot.login(main.TOKEN) # HTTP only, no websocket; setup_hook loads the reminders cog
+    bot.reminder_scheduler.start()
+    log.info("📬 Reminder worker %s running", bot.worker_id, extra={"worker_id": bot.worker_id})
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await bot.reminder_scheduler.close()
+        await bot.outbound.close()
+        await bot.http.close()
+        await close_db()
+
+
+if __name__ == "__main__":
+    logs.setup()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,132 @@
+# scheduler.py
+import asyncio
+import heapq
+import itertools
+import time
+
+from logs import get_logger
+
+log = get_logger("scheduler")
+
+MAX_SLEEP = 3600  # re-check at least hourly, guards against wall-clock jumps
+
+
+class DueScheduler:
+    """In-process min-heap of pending timers (reminders, game resets) keyed by due time.
+
+    The run loop sleeps exactly until the earliest due time (or until
+    ``schedule``/``cancel`` changes the head of the heap) and then hands every
+    due payload to ``on_due`` in one batch. Cancelled or rescheduled entries
+    stay in the heap and are skipped lazily when they surface.
+
+    ``on_due`` is looked up on every wake-up, so a reloaded extension can swap
+    in its new handler while the pending timers stay where they are.
+    """
+
+    def __init__(self, on_due, max_sleep: float = MAX_SLEEP, clock=time.time):
+        self.on_due = on_due
+        self._max_sleep = max_sleep
+        self._clock = clock
+        self._heap = []  # (due, seq, key); seq breaks ties, keys of mixed types (ids, "poll") never get compared
+        self._seq = itertools.count()
+        self._entries = {}  # key -> (due, payload)
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._batch = None  # the on_due call in progress, stop() doesn't cut it off
+        self._closed = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def schedule(self, key, due: float, payload=None):
+        """Add or move a timer; ``due`` is a unix timestamp."""
+        self._entries[key] = (due, payload)
+        heapq.heappush(self._heap, (due, next(self._seq), key))
+        if self._heap[0][2] == key:
+            self._wakeup.set()
+
+    def cancel(self, key):
+        """Forget a timer. Returns True if it was scheduled."""
+        return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        self._heap.clear()
+        self._entries.clear()
+        self._wakeup.set()
+
+    def next_due(self):
+        """Due time of the earliest live entry, or None if empty."""
+        heap = self._heap
+        while heap:
+            due, _, key = heap[0]
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == due:
+                return due
+            heapq.heappop(heap)  # stale (cancelled or rescheduled)
+        return None
+
+    def pop_due(self, now: float = None):
+        """Remove and return ``(due, payload)`` for everything due at ``now``."""
+        if now is None:
+            now = self._clock()
+        due_items = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            due, _, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != due:
+                continue
+            del self._entries[key]
+            due_items.append(entry)
+        return due_items
+
+    # -----------------------------
+    # Run loop
+    # -----------------------------
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if not self.running and not self._closed:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def close(self):
+        """Stop for good (shutdown): no more wake-ups, the batch being handled right now still finishes."""
+        self._closed = True
+        self.stop()
+        if self._batch is not None:
+            await asyncio.wait([self._batch])
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            due = self.next_due()
+            delay = self._max_sleep if due is None else min(self._max_sleep, due - self._clock())
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    continue  # heap head changed, recompute the sleep
+                except asyncio.TimeoutError:
+                    pass
+
+            items = self.pop_due()
+            if not items:
+                continue
+            # shielded, so stopping the loop never cancels a handler halfway through its DB writes
+            self._batch = asyncio.create_task(self._handle(items))
+            await asyncio.shield(self._batch)
+
+    async def _handle(self, items):
+        try:
+            await self.on_due(items)
+        except Exception:
+            log.exception("⚠️ Scheduled job failed", extra={"jobs": len(items)})